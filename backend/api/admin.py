@@ -3,7 +3,8 @@ from .models import (
     JoinableTripPost, JoinableTripImage, TripJoinRequest,
     TripGroup, TripGroupMember, ExperiencePost, ExperienceDay,
     ExperienceDayImage, GeneralPost, GeneralPostImage,
-    Like, Comment, SavedPost, Message, Notification, Follow ,Story, StoryView
+    Like, Comment, SavedPost, Message, Notification, Follow ,Story, StoryView,
+    TimelineEntry, PostIndex, Conversation, MessageArchiveSegment
 
 )
 
@@ -27,3 +28,7 @@ admin.site.register(Notification)
 admin.site.register(Follow)
 admin.site.register(Story)
 admin.site.register(StoryView)
+admin.site.register(TimelineEntry)
+admin.site.register(PostIndex)
+admin.site.register(Conversation)
+admin.site.register(MessageArchiveSegment)
@@ -0,0 +1,135 @@
+import bisect
+import threading
+import time
+from django.core.cache import cache
+from .models import User
+
+
+# Each worker keeps its own sorted-array index. Writers bump a shared
+# generation in the cache so other workers rebuild on their next lookup.
+GENERATION_KEY = 'autocomplete:users:generation'
+INDEXED_FIELDS = ('username', 'full_name')
+
+
+def user_keys(username, full_name):
+    keys = {username.lower()}
+    full_name = (full_name or '').strip().lower()
+    if full_name:
+        keys.add(full_name)
+        keys.update(full_name.split())
+    return keys
+
+
+class PrefixIndex:
+    def __init__(self, rows=()):
+        self.user_keys = {user_id: user_keys(username, full_name) for user_id, username, full_name in rows}
+        entries = sorted((key, user_id) for user_id, keys in self.user_keys.items() for key in keys)
+        self.keys = [key for key, _ in entries]
+        self.ids = [user_id for _, user_id in entries]
+
+    def add(self, user_id, username, full_name):
+        self.remove(user_id)
+        keys = user_keys(username, full_name)
+        self.user_keys[user_id] = keys
+        for key in keys:
+            position = bisect.bisect_left(self.keys, key)
+            while position < len(self.keys) and self.keys[position] == key and self.ids[position] < user_id:
+                position += 1
+            self.keys.insert(position, key)
+            self.ids.insert(position, user_id)
+
+    def remove(self, user_id):
+        for key in self.user_keys.pop(user_id, ()):
+            position = bisect.bisect_left(self.keys, key)
+            while position < len(self.keys) and self.keys[position] == key:
+                if self.ids[position] == user_id:
+                    del self.keys[position]
+                    del self.ids[position]
+                    break
+                position += 1
+
+    def count(self, prefix, exclude=None):
+        prefix = prefix.strip().lower()
+        if not prefix:
+            return 0
+        start = bisect.bisect_left(self.keys, prefix)
+        end = bisect.bisect_left(self.keys, prefix + '\uffff', lo=start)
+        return len(set(self.ids[start:end]) - {exclude})
+
+    def search(self, prefix, limit, exclude=None):
+        prefix = prefix.strip().lower()
+        if not prefix:
+            return []
+        found = []
+        position = bisect.bisect_left(self.keys, prefix)
+        while position < len(self.keys) and len(found) < limit and self.keys[position].startswith(prefix):
+            user_id = self.ids[position]
+            if user_id != exclude and user_id not in found:
+                found.append(user_id)
+            position += 1
+        return found
+
+
+_index = None
+_generation = None
+_lock = threading.Lock()
+
+
+def build():
+    return PrefixIndex(User.objects.values_list('id', *INDEXED_FIELDS).iterator())
+
+
+def get_index():
+    global _index, _generation
+    generation = cache.get(GENERATION_KEY)
+    with _lock:
+        if _index is None or generation != _generation:
+            _index = build()
+            _generation = generation
+        return _index
+
+
+def _bump():
+    global _generation
+    _generation = time.time_ns()
+    cache.set(GENERATION_KEY, _generation, None)
+
+
+def _current_index():
+    # Only patch an index that is in sync with the shared generation; a stale
+    # one is dropped so the next lookup rebuilds it with other workers' writes.
+    global _index
+    if _index is not None and _generation != cache.get(GENERATION_KEY):
+        _index = None
+    return _index
+
+
+def update_user(user):
+    with _lock:
+        index = _current_index()
+        if index is not None:
+            index.add(user.id, user.username, user.full_name)
+        _bump()
+
+
+def remove_user(user):
+    with _lock:
+        index = _current_index()
+        if index is not None:
+            index.remove(user.id)
+        _bump()
+
+
+def invalidate():
+    with _lock:
+        _bump()
+
+
+def count_users(prefix, exclude=None):
+    return get_index().count(prefix, exclude=exclude)
+
+
+def search_users(prefix, limit=10, exclude=None):
+    ids = get_index().search(prefix, limit, exclude=exclude)
+    users = User.objects.in_bulk(ids)
+    return [users[user_id] for user_id in ids if user_id in users]
@@ -0,0 +1,115 @@
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.db import transaction
+from django.db.models import F
+from .models import Message, TripGroupMember
+from .serializers import MessageSerializer
+from . import message_archive
+
+
+HISTORY_PAGE_SIZE = 50
+MAX_HISTORY_PAGE_SIZE = 200
+
+
+# Every connected ChatConsumer joins its user's chat group, so a direct message
+# is pushed to exactly two groups no matter how many conversations exist.
+def chat_group(user_id):
+    return f"chat_{user_id}"
+
+
+# Sockets of trip group members also join the trip group's channel-layer group,
+# so a group message is one broadcast however many members are connected.
+def trip_group_channel(group_id):
+    return f"trip_group_{group_id}"
+
+
+def message_payload(message):
+    # Plain dict so it survives layers that msgpack their events.
+    return dict(MessageSerializer(message).data)
+
+
+def _group_send(name, event):
+    channel_layer = get_channel_layer()
+    if channel_layer is not None:
+        async_to_sync(channel_layer.group_send)(name, event)
+
+
+def push_direct_message(message):
+    event = {'type': 'chat.message', 'message': message_payload(message)}
+    for user_id in {message.sender_id, message.receiver_id}:
+        _group_send(chat_group(user_id), event)
+
+
+def push_group_message(message):
+    _group_send(trip_group_channel(message.group_id), {'type': 'chat.message', 'message': message_payload(message)})
+
+
+def send_direct_message(sender, receiver, content):
+    message = Message.objects.create(sender=sender, receiver=receiver, content=content)
+    transaction.on_commit(lambda: push_direct_message(message))
+    return message
+
+
+def send_group_message(sender, group, content):
+    message = Message.objects.create(sender=sender, group=group, content=content)
+    transaction.on_commit(lambda: push_group_message(message))
+    return message
+
+
+def subscribe_member(user_id, group_id):
+    # Reaches the member's open sockets, which then join or leave the trip group.
+    transaction.on_commit(lambda: _group_send(chat_group(user_id), {'type': 'chat.subscribe', 'group': group_id}))
+
+
+def unsubscribe_member(user_id, group_id):
+    transaction.on_commit(lambda: _group_send(chat_group(user_id), {'type': 'chat.unsubscribe', 'group': group_id}))
+
+
+def history_bounds(params):
+    # ?before=<id> pages backwards, ?after=<id> fetches what arrived since; raises ValueError on junk.
+    before, after = params.get('before'), params.get('after')
+    return (int(before) if before else None), (int(after) if after else None)
+
+
+def _window(queryset, before, after, limit):
+    # Ids are the keyset: bounded and ordered on the same column, the
+    # (sender, receiver, id) and (group, id) indexes seek straight to the page.
+    if after is not None:
+        return list(queryset.filter(id__gt=after).order_by('id')[:limit])
+    if before is not None:
+        queryset = queryset.filter(id__lt=before)
+    return list(queryset.order_by('-id')[:limit])[::-1]
+
+
+def group_history(group, before=None, after=None, limit=HISTORY_PAGE_SIZE):
+    messages = _window(Message.objects.filter(group=group).select_related('sender'), before, after, limit)
+    return message_archive.read_through(message_archive.group_thread(group.id), messages, before, after, limit)
+
+
+def direct_history(user, other_id, before=None, after=None, limit=HISTORY_PAGE_SIZE):
+    # One (sender, receiver, id) range per direction, merged here, rather
+    # than an OR the index cannot return in order.
+    sides = [
+        Message.objects.filter(sender=user, receiver_id=other_id),
+        Message.objects.filter(sender_id=other_id, receiver=user),
+    ]
+    messages = sorted(
+        (message for side in sides for message in _window(side.select_related('sender'), before, after, limit)),
+        key=lambda message: message.id,
+    )
+    messages = messages[:limit] if after is not None else messages[-limit:]
+    return message_archive.read_through(message_archive.direct_thread(user.id, other_id), messages, before, after, limit)
+
+
+def mark_group_read(group, user, message_id):
+    TripGroupMember.objects.filter(
+        group=group, user=user, last_read_message_id__lt=message_id
+    ).update(last_read_message_id=message_id)
+
+
+def group_unread_total(user):
+    # Counted per membership as messages past its cursor, on the (group, id) index.
+    return Message.objects.filter(
+        group__group_memberships__user=user,
+        id__gt=F('group__group_memberships__last_read_message_id'),
+    ).exclude(sender=user).count()
@@ -0,0 +1,204 @@
+import math
+import threading
+import numpy as np
+from django.core.cache import cache
+from django.db import connection, transaction
+from .models import PostIndex
+from .feeds import POST_TYPE_MODELS, post_type_of
+
+
+# Points are projected to unit Web Mercator space and bucketed per zoom; zoom
+# MAX_ZOOM + 1 serves the individual posts.
+MAX_ZOOM = 16
+RADIUS_PX = 60
+TILE_EXTENT = 512
+
+POST_TYPES = list(POST_TYPE_MODELS)
+
+
+def project(longitudes, latitudes):
+    x = longitudes / 360.0 + 0.5
+    sin = np.sin(np.radians(np.clip(latitudes, -85.0511, 85.0511)))
+    y = 0.5 - 0.25 * np.log((1 + sin) / (1 - sin)) / math.pi
+    return x, y
+
+
+def unproject(xs, ys):
+    longitudes = (xs - 0.5) * 360.0
+    latitudes = np.degrees(2 * np.arctan(np.exp((0.5 - ys) * 2 * math.pi)) - math.pi / 2)
+    return longitudes, latitudes
+
+
+def cell_size(zoom):
+    return RADIUS_PX / (TILE_EXTENT * 2 ** zoom)
+
+
+class ClusterIndex:
+    # Grid clustering: at each zoom a point belongs to one cell of RADIUS_PX
+    # screen pixels, and a cell's marker sits at its members' centroid. Adding
+    # or removing a post touches exactly one cell per zoom.
+    def __init__(self, rows=()):
+        self.points = {}
+        self.cells = [{} for _ in range(MAX_ZOOM + 1)]
+        self._levels = {}
+        for post_type, post_id, latitude, longitude in rows:
+            self.add(post_type, post_id, latitude, longitude)
+
+    def add(self, post_type, post_id, latitude, longitude):
+        self.remove(post_type, post_id)
+        if latitude is None or longitude is None:
+            return
+        key = (POST_TYPES.index(post_type), post_id)
+        xs, ys = project(np.array([float(longitude)]), np.array([float(latitude)]))
+        x, y = float(xs[0]), float(ys[0])
+        self.points[key] = (x, y)
+        for zoom, cells in enumerate(self.cells):
+            size = cell_size(zoom)
+            cell = cells.setdefault((math.floor(x / size), math.floor(y / size)), [0.0, 0.0, set()])
+            cell[0] += x
+            cell[1] += y
+            cell[2].add(key)
+        self._levels.clear()
+
+    def remove(self, post_type, post_id):
+        key = (POST_TYPES.index(post_type), post_id)
+        point = self.points.pop(key, None)
+        if point is None:
+            return
+        x, y = point
+        for zoom, cells in enumerate(self.cells):
+            size = cell_size(zoom)
+            cell_key = (math.floor(x / size), math.floor(y / size))
+            cell = cells[cell_key]
+            cell[2].discard(key)
+            if cell[2]:
+                cell[0] -= x
+                cell[1] -= y
+            else:
+                del cells[cell_key]
+        self._levels.clear()
+
+    def level(self, zoom):
+        # Flattened to arrays on first read after a change so bbox filters stay vectorised.
+        if zoom not in self._levels:
+            if zoom > MAX_ZOOM:
+                entries = [(x, y, 1, key) for key, (x, y) in self.points.items()]
+            else:
+                entries = [
+                    (sum_x / len(members), sum_y / len(members), len(members), next(iter(members)) if len(members) == 1 else (-1, -1))
+                    for sum_x, sum_y, members in self.cells[zoom].values()
+                ]
+            xs = np.array([entry[0] for entry in entries], dtype=np.float64)
+            ys = np.array([entry[1] for entry in entries], dtype=np.float64)
+            level = {
+                'count': np.array([entry[2] for entry in entries], dtype=np.int64),
+                'type': np.array([entry[3][0] for entry in entries], dtype=np.int8),
+                'id': np.array([entry[3][1] for entry in entries], dtype=np.int64),
+            }
+            level['lng'], level['lat'] = unproject(xs, ys)
+            self._levels[zoom] = level
+        return self._levels[zoom]
+
+
+def build():
+    return ClusterIndex(
+        PostIndex.objects.exclude(latitude=None).exclude(longitude=None)
+        .values_list('post_type', 'post_id', 'latitude', 'longitude')
+        .iterator()
+    )
+
+
+# Post writes are appended to a numbered change log in the cache. Each worker
+# replays the entries it has not seen onto its own index, and falls back to a
+# background rebuild when entries have expired or the backlog is too long.
+SEQUENCE_KEY = 'clusters:seq'
+CHANGE_TTL = 3600
+MAX_REPLAY = 1000
+
+_index = None
+_seq = 0
+_building = False
+_lock = threading.Lock()
+
+
+def _change_key(seq):
+    return f"clusters:change:{seq}"
+
+
+def _record(change):
+    try:
+        seq = cache.incr(SEQUENCE_KEY)
+    except ValueError:
+        cache.add(SEQUENCE_KEY, 0, None)
+        seq = cache.incr(SEQUENCE_KEY)
+    cache.set(_change_key(seq), change, CHANGE_TTL)
+
+
+def post_saved(post):
+    change = (post_type_of(post), post.id, post.latitude, post.longitude)
+    transaction.on_commit(lambda: _record(change))
+
+
+def post_deleted(post):
+    change = (post_type_of(post), post.id, None, None)
+    transaction.on_commit(lambda: _record(change))
+
+
+def _rebuild():
+    global _index, _seq, _building
+    try:
+        seq = cache.get(SEQUENCE_KEY, 0)
+        index = build()
+        with _lock:
+            _index = index
+            _seq = seq
+    finally:
+        _building = False
+        connection.close()
+
+
+def get_index():
+    # The first lookup builds while holding the lock, so concurrent cold
+    # requests wait for that one build instead of each running their own.
+    global _index, _seq, _building
+    seq = cache.get(SEQUENCE_KEY, 0)
+    with _lock:
+        if _index is None:
+            _index = build()
+            _seq = seq
+            return _index
+        if seq == _seq or _building:
+            return _index
+        changes = {}
+        if _seq < seq <= _seq + MAX_REPLAY:
+            changes = cache.get_many([_change_key(n) for n in range(_seq + 1, seq + 1)])
+        if len(changes) != seq - _seq:
+            _building = True
+            threading.Thread(target=_rebuild, daemon=True).start()
+            return _index
+        for n in range(_seq + 1, seq + 1):
+            _index.add(*changes[_change_key(n)])
+        _seq = seq
+        return _index
+
+
+def clusters(west, south, east, north, zoom):
+    index = get_index()
+    with _lock:
+        level = index.level(max(0, min(int(zoom), MAX_ZOOM + 1)))
+    if west <= east:
+        in_lng = (level['lng'] >= west) & (level['lng'] <= east)
+    else:
+        in_lng = (level['lng'] >= west) | (level['lng'] <= east)
+    selected = np.flatnonzero(in_lng & (level['lat'] >= south) & (level['lat'] <= north))
+
+    return [
+        {
+            'latitude': round(float(level['lat'][i]), 6),
+            'longitude': round(float(level['lng'][i]), 6),
+            'count': int(level['count'][i]),
+            'post_type': POST_TYPES[level['type'][i]] if level['type'][i] >= 0 else None,
+            'post_id': int(level['id'][i]) if level['id'][i] >= 0 else None,
+        }
+        for i in selected.tolist()
+    ]
@@ -1,5 +1,11 @@
 import json
+from channels.db import database_sync_to_async
 from channels.generic.websocket import AsyncWebsocketConsumer
+from django.contrib.auth import get_user_model
+from .chat import chat_group, send_direct_message, send_group_message, trip_group_channel
+from .models import TripGroup, TripGroupMember
+
+User = get_user_model()
 
 
 class NotificationConsumer(AsyncWebsocketConsumer):
@@ -17,13 +23,110 @@ class NotificationConsumer(AsyncWebsocketConsumer):
                 self.channel_name
             )
 
-            await self.accept()
+            await self.accept(self.scope.get('auth_subprotocol'))
 
     async def disconnect(self, close_code):
-        await self.channel_layer.group_discard(
-            self.group_name,
-            self.channel_name
-        )
+        if hasattr(self, 'group_name'):
+            await self.channel_layer.group_discard(
+                self.group_name,
+                self.channel_name
+            )
 
     async def send_notification(self, event):
         await self.send(text_data=json.dumps(event["message"]))
+
+
+class ChatConsumer(AsyncWebsocketConsumer):
+
+    async def connect(self):
+        self.user = self.scope["user"]
+
+        if self.user.is_anonymous:
+            await self.close()
+        else:
+            self.group_name = chat_group(self.user.id)
+            self.trip_groups = set()
+
+            await self.channel_layer.group_add(
+                self.group_name,
+                self.channel_name
+            )
+            for group_id in await self.member_group_ids():
+                await self.join_trip_group(group_id)
+
+            await self.accept(self.scope.get('auth_subprotocol'))
+
+    async def disconnect(self, close_code):
+        if hasattr(self, 'group_name'):
+            await self.channel_layer.group_discard(
+                self.group_name,
+                self.channel_name
+            )
+            for group_id in list(self.trip_groups):
+                await self.leave_trip_group(group_id)
+
+    async def receive(self, text_data=None, bytes_data=None):
+        try:
+            data = json.loads(text_data or '')
+            group_id = int(data['group']) if data.get('group') else None
+            receiver_id = None if group_id else int(data['receiver'])
+        except (ValueError, TypeError, KeyError, AttributeError):
+            await self.send_error('Invalid message')
+            return
+
+        content = str(data.get('content', ''))
+        if group_id:
+            message = await self.create_group_message(group_id, content)
+            error = 'Not a member'
+        else:
+            message = await self.create_message(receiver_id, content)
+            error = 'User not found'
+        if message is None:
+            await self.send_error(error, data.get('client_id'))
+            return
+
+        await self.send(text_data=json.dumps({
+            'type': 'ack',
+            'client_id': data.get('client_id'),
+            'message_id': message.id,
+        }))
+
+    async def chat_message(self, event):
+        message = dict(event['message'], is_mine=event['message']['sender'] == self.user.id)
+        await self.send(text_data=json.dumps({'type': 'message', 'message': message}))
+
+    async def chat_subscribe(self, event):
+        await self.join_trip_group(event['group'])
+
+    async def chat_unsubscribe(self, event):
+        await self.leave_trip_group(event['group'])
+
+    async def join_trip_group(self, group_id):
+        self.trip_groups.add(group_id)
+        await self.channel_layer.group_add(trip_group_channel(group_id), self.channel_name)
+
+    async def leave_trip_group(self, group_id):
+        self.trip_groups.discard(group_id)
+        await self.channel_layer.group_discard(trip_group_channel(group_id), self.channel_name)
+
+    async def send_error(self, error, client_id=None):
+        await self.send(text_data=json.dumps({'type': 'error', 'client_id': client_id, 'error': error}))
+
+    @database_sync_to_async
+    def member_group_ids(self):
+        return list(TripGroupMember.objects.filter(user=self.user).values_list('group_id', flat=True))
+
+    @database_sync_to_async
+    def create_message(self, receiver_id, content):
+        try:
+            receiver = User.objects.get(pk=receiver_id)
+        except User.DoesNotExist:
+            return None
+        return send_direct_message(self.user, receiver, content)
+
+    @database_sync_to_async
+    def create_group_message(self, group_id, content):
+        group = TripGroup.objects.filter(pk=group_id, group_memberships__user=self.user).first()
+        if group is None:
+            return None
+        return send_group_message(self.user, group, content)
@@ -0,0 +1,151 @@
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Case, F, Q, Sum, Value, When
+from .models import Conversation, Message
+
+
+PREVIEW_LENGTH = 255
+
+
+def pair(user_id, other_id):
+    return min(user_id, other_id), max(user_id, other_id)
+
+
+def side(conversation_first_id, user_id):
+    return 'first' if user_id == conversation_first_id else 'second'
+
+
+def for_user(user):
+    return Conversation.objects.filter(
+        Q(first_user=user) | Q(second_user=user)
+    ).select_related('first_user', 'second_user').order_by('-last_activity_at')
+
+
+def _if_newer(message, field, value):
+    # Messages can commit out of order; only a newer id may replace the summary.
+    return Case(
+        When(last_message_id__lt=message.id, then=Value(value)),
+        default=F(field),
+        output_field=Conversation._meta.get_field(field),
+    )
+
+
+def record_message(message):
+    first_id, second_id = pair(message.sender_id, message.receiver_id)
+    # last_message_id goes last: MySQL evaluates SET assignments left to right.
+    changes = {
+        'last_message_preview': _if_newer(message, 'last_message_preview', message.content[:PREVIEW_LENGTH]),
+        'last_activity_at': _if_newer(message, 'last_activity_at', message.created_at),
+        'last_message_id': _if_newer(message, 'last_message_id', message.id),
+    }
+    unread = {}
+    if message.sender_id != message.receiver_id:
+        field = f"{side(first_id, message.receiver_id)}_unread"
+        unread = {field: 1}
+        changes[field] = F(field) + 1
+
+    conversations = Conversation.objects.filter(first_user_id=first_id, second_user_id=second_id)
+    if conversations.update(**changes):
+        return
+    try:
+        with transaction.atomic():
+            Conversation.objects.create(
+                first_user_id=first_id,
+                second_user_id=second_id,
+                last_message_id=message.id,
+                last_message_preview=message.content[:PREVIEW_LENGTH],
+                last_activity_at=message.created_at,
+                **unread
+            )
+    except IntegrityError:
+        conversations.update(**changes)
+
+
+def mark_read(user, other_id):
+    # A single-row write however long the backlog: the reader's cursor jumps to
+    # the last message and, under the same row lock, its counter drops to zero.
+    first_id, second_id = pair(user.id, other_id)
+    reader = side(first_id, user.id)
+    Conversation.objects.filter(first_user_id=first_id, second_user_id=second_id).update(**{
+        f'{reader}_last_read_message_id': F('last_message_id'),
+        f'{reader}_unread': 0,
+    })
+
+
+def read_cursors(user, other_id):
+    first_id, second_id = pair(user.id, other_id)
+    conversation = Conversation.objects.filter(first_user_id=first_id, second_user_id=second_id).first()
+    if conversation is None:
+        return {}
+    return {
+        first_id: conversation.first_last_read_message_id,
+        second_id: conversation.second_last_read_message_id,
+    }
+
+
+def unread_total(user):
+    return for_user(user).aggregate(total=Sum(Case(
+        When(first_user=user, then=F('first_unread')),
+        default=F('second_unread'),
+    )))['total'] or 0
+
+
+def rebuild(chunk_size=1000):
+    # Read cursors survive the rebuild; unread counters are recounted against them.
+    cursors = {
+        (first_id, second_id): {'first_last_read_message_id': first_cursor, 'second_last_read_message_id': second_cursor}
+        for first_id, second_id, first_cursor, second_cursor in Conversation.objects.values_list(
+            'first_user_id', 'second_user_id', 'first_last_read_message_id', 'second_last_read_message_id'
+        )
+    }
+    summaries = {}
+    last_id = 0
+    while True:
+        chunk = list(
+            Message.objects.filter(id__gt=last_id, receiver__isnull=False)
+            .order_by('id')
+            .values('id', 'sender_id', 'receiver_id', 'content', 'created_at')[:chunk_size]
+        )
+        if not chunk:
+            break
+        last_id = chunk[-1]['id']
+        for message in chunk:
+            key = pair(message['sender_id'], message['receiver_id'])
+            summary = summaries.get(key)
+            if summary is None:
+                summary = summaries[key] = {
+                    'first_last_read_message_id': 0,
+                    'second_last_read_message_id': 0,
+                    **cursors.get(key, {}),
+                    'first_unread': 0,
+                    'second_unread': 0,
+                }
+            summary.update(
+                last_message_id=message['id'],
+                last_message_preview=message['content'][:PREVIEW_LENGTH],
+                last_activity_at=message['created_at'],
+            )
+            reader = side(key[0], message['receiver_id'])
+            if message['sender_id'] != message['receiver_id'] and message['id'] > summary[f'{reader}_last_read_message_id']:
+                summary[f'{reader}_unread'] += 1
+
+    # Upserted rather than replaced: pairs whose messages have all been
+    # archived keep their existing summary. MySQL's ON DUPLICATE KEY UPDATE
+    # takes no conflict target, so the pair's unique key is named only elsewhere.
+    if connection.features.supports_update_conflicts_with_target:
+        conflict_target = {'unique_fields': ['first_user', 'second_user']}
+    else:
+        conflict_target = {}
+    Conversation.objects.bulk_create(
+        [
+            Conversation(first_user_id=first_id, second_user_id=second_id, **summary)
+            for (first_id, second_id), summary in summaries.items()
+        ],
+        batch_size=chunk_size,
+        update_conflicts=True,
+        **conflict_target,
+        update_fields=[
+            'last_message_id', 'last_message_preview', 'last_activity_at',
+            'first_last_read_message_id', 'second_last_read_message_id', 'first_unread', 'second_unread',
+        ],
+    )
+    return len(summaries)
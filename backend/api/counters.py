@@ -0,0 +1,66 @@
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import Count, F
+from .models import Like, Comment, SavedPost
+from .feeds import POST_TYPE_MODELS
+
+
+COUNTER_SOURCES = {
+    'like_count': Like,
+    'comment_count': Comment,
+    'save_count': SavedPost,
+}
+
+COUNTER_FIELDS = {source: field for field, source in COUNTER_SOURCES.items()}
+
+
+def adjust_counter(instance, delta):
+    # Called from signals inside the transaction that writes the Like/Comment/SavedPost row.
+    model = ContentType.objects.get_for_id(instance.content_type_id).model_class()
+    if model not in POST_TYPE_MODELS.values():
+        return
+
+    field = COUNTER_FIELDS[type(instance)]
+    queryset = model.objects.filter(pk=instance.object_id)
+    if delta < 0:
+        queryset = queryset.filter(**{f"{field}__gte": -delta})
+    queryset.update(**{field: F(field) + delta})
+
+
+def reconcile_counters(post_type, chunk_size=1000):
+    model = POST_TYPE_MODELS[post_type]
+    ct = ContentType.objects.get_for_model(model)
+    fields = list(COUNTER_SOURCES)
+    fixed = 0
+    last_id = 0
+
+    while True:
+        chunk = list(model.objects.filter(id__gt=last_id).order_by('id').only('id', *fields)[:chunk_size])
+        if not chunk:
+            return fixed
+        last_id = chunk[-1].id
+        ids = [post.id for post in chunk]
+
+        actual = {}
+        for field, source in COUNTER_SOURCES.items():
+            rows = (
+                source.objects.filter(content_type=ct, object_id__in=ids)
+                .order_by()
+                .values('object_id')
+                .annotate(n=Count('id'))
+                .values_list('object_id', 'n')
+            )
+            actual[field] = dict(rows)
+
+        drifted = []
+        for post in chunk:
+            changed = False
+            for field in fields:
+                value = actual[field].get(post.id, 0)
+                if getattr(post, field) != value:
+                    setattr(post, field, value)
+                    changed = True
+            if changed:
+                drifted.append(post)
+
+        model.objects.bulk_update(drifted, fields)
+        fixed += len(drifted)
@@ -0,0 +1,89 @@
+import hashlib
+import time
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+from django.db import transaction
+from .feeds import POST_TYPE_MODELS, POST_TYPE_AUTHOR_FIELDS
+
+
+# Cached feed pages are stored with the version of every tag they depend on
+# (the viewer plus the authors shown). Invalidation bumps a tag's version,
+# taken from a shared clock that only moves forward.
+# Bumps wait for the writing transaction to commit, and a page is only stored
+# if none of its tags moved past the clock read when its computation started;
+# otherwise a reader could cache pre-commit state under the new version.
+FEED_CACHE_TTL = getattr(settings, 'FEED_CACHE_TTL', 60)
+CACHED_PARAMS = ('cursor', 'limit', 'order')
+CLOCK_KEY = 'feedcache:clock'
+
+
+def _tag_key(kind, pk):
+    return f"feedcache:tag:{kind}:{pk}"
+
+
+def _response_key(viewer_id, feed, params):
+    raw = '&'.join(f"{name}={params.get(name, '')}" for name in CACHED_PARAMS)
+    return f"feedcache:{feed}:{viewer_id}:{hashlib.md5(raw.encode()).hexdigest()}"
+
+
+def _clock():
+    # Seeded from the wall clock, so a clock evicted from the cache restarts
+    # ahead of every version it handed out.
+    now = cache.get(CLOCK_KEY)
+    if now is None:
+        cache.add(CLOCK_KEY, time.time_ns(), None)
+        now = cache.get(CLOCK_KEY, 0)
+    return now
+
+
+def _next_version():
+    try:
+        return cache.incr(CLOCK_KEY)
+    except ValueError:
+        cache.add(CLOCK_KEY, time.time_ns(), None)
+        return cache.incr(CLOCK_KEY)
+
+
+def touch_viewer(user_id):
+    transaction.on_commit(lambda: cache.set(_tag_key('viewer', user_id), _next_version(), None))
+
+
+def touch_authors(author_ids):
+    keys = [_tag_key('author', author_id) for author_id in author_ids]
+    transaction.on_commit(lambda: cache.set_many(dict.fromkeys(keys, _next_version()), None))
+
+
+def touch_target_author(instance):
+    # instance is a Like, Comment or SavedPost pointing at a post
+    model = ContentType.objects.get_for_id(instance.content_type_id).model_class()
+    for post_type, post_model in POST_TYPE_MODELS.items():
+        if model is post_model:
+            field = f"{POST_TYPE_AUTHOR_FIELDS[post_type]}_id"
+            author_id = model.objects.filter(pk=instance.object_id).values_list(field, flat=True).first()
+            if author_id:
+                touch_authors([author_id])
+            return
+
+
+def get_response(viewer_id, feed, params):
+    """Return (data, started): the cached page or None, and the clock to pass to set_response on a miss."""
+    started = _clock()
+    entry = cache.get(_response_key(viewer_id, feed, params))
+    if entry is None:
+        return None, started
+    tags, data = entry
+    current = cache.get_many(list(tags))
+    if any(current.get(key) != version for key, version in tags.items()):
+        return None, started
+    return data, started
+
+
+def set_response(viewer_id, feed, params, data, author_ids, started):
+    tag_keys = [_tag_key('viewer', viewer_id)] + [_tag_key('author', author_id) for author_id in set(author_ids)]
+    versions = cache.get_many(tag_keys)
+    if any(version > started for version in versions.values()):
+        # A write committed while the page was computed; it may not reflect it.
+        return
+    tags = {key: versions.get(key) for key in tag_keys}
+    cache.set(_response_key(viewer_id, feed, params), (tags, data), FEED_CACHE_TTL)
@@ -0,0 +1,72 @@
+from django.contrib.contenttypes.models import ContentType
+from .models import ExperiencePost, GeneralPost, JoinableTripPost
+from .serializers import ExperiencePostSerializer, GeneralPostSerializer, JoinableTripPostSerializer
+from .viewer_state import viewer_context
+
+
+POST_TYPE_MODELS = {
+    'experience': ExperiencePost,
+    'general': GeneralPost,
+    'joinable': JoinableTripPost,
+}
+
+POST_TYPE_AUTHOR_FIELDS = {
+    'experience': 'author',
+    'general': 'author',
+    'joinable': 'creator',
+}
+
+POST_TYPE_SERIALIZERS = {
+    'experience': ExperiencePostSerializer,
+    'general': GeneralPostSerializer,
+    'joinable': JoinableTripPostSerializer,
+}
+
+
+def post_type_of(obj):
+    for post_type, model in POST_TYPE_MODELS.items():
+        if isinstance(obj, model):
+            return post_type
+    return None
+
+
+def author_id_of(obj):
+    return getattr(obj, f"{POST_TYPE_AUTHOR_FIELDS[post_type_of(obj)]}_id")
+
+
+def content_type_post_types():
+    content_types = ContentType.objects.get_for_models(*POST_TYPE_MODELS.values())
+    return {content_types[model].id: post_type for post_type, model in POST_TYPE_MODELS.items()}
+
+
+def post_queryset(post_type):
+    queryset = POST_TYPE_MODELS[post_type].objects.all()
+    if post_type == 'experience':
+        return queryset.select_related('author').prefetch_related('days__photos')
+    if post_type == 'general':
+        return queryset.select_related('author').prefetch_related('images')
+    return queryset.select_related('creator', 'group').prefetch_related('images')
+
+
+def hydrate_posts(refs):
+    # refs is an ordered list of (post_type, post_id); one query per type, order preserved
+    ids_by_type = {}
+    for post_type, post_id in refs:
+        ids_by_type.setdefault(post_type, []).append(post_id)
+
+    found = {}
+    for post_type, ids in ids_by_type.items():
+        for obj in post_queryset(post_type).filter(id__in=ids):
+            found[(post_type, obj.id)] = obj
+
+    return [(post_type, found[(post_type, post_id)]) for post_type, post_id in refs if (post_type, post_id) in found]
+
+
+def serialize_posts(items, request):
+    context = viewer_context(request, [obj for _, obj in items])
+    feed = []
+    for post_type, obj in items:
+        data = POST_TYPE_SERIALIZERS[post_type](obj, context=context).data
+        data['post_type'] = post_type
+        feed.append(data)
+    return feed
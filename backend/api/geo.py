@@ -0,0 +1,89 @@
+import math
+import numpy as np
+from django.db.models import Q
+from .models import PostIndex
+
+
+BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+GEOHASH_PRECISION = 9
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = 111.32
+
+
+def encode(latitude, longitude, precision=GEOHASH_PRECISION):
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    value = 0
+    even = True
+    while len(chars) < precision:
+        rng, coordinate = (lng_range, longitude) if even else (lat_range, latitude)
+        mid = (rng[0] + rng[1]) / 2
+        value <<= 1
+        if coordinate >= mid:
+            value |= 1
+            rng[0] = mid
+        else:
+            rng[1] = mid
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(BASE32[value])
+            bits = 0
+            value = 0
+    return ''.join(chars)
+
+
+def cell_size(precision):
+    # (height, width) of a geohash cell in degrees
+    total_bits = 5 * precision
+    lng_bits = (total_bits + 1) // 2
+    lat_bits = total_bits // 2
+    return 180.0 / 2 ** lat_bits, 360.0 / 2 ** lng_bits
+
+
+def cover_cells(latitude, longitude, radius_km):
+    # The 3x3 block of cells around the centre covers the circle once a cell is
+    # at least radius_km on each side; returns None when even one character is too small.
+    cos_lat = math.cos(math.radians(latitude))
+    for precision in range(GEOHASH_PRECISION, 0, -1):
+        height, width = cell_size(precision)
+        if height * KM_PER_DEGREE >= radius_km and width * KM_PER_DEGREE * cos_lat >= radius_km:
+            cells = set()
+            for d_lat in (-height, 0, height):
+                for d_lng in (-width, 0, width):
+                    lat = min(max(latitude + d_lat, -90.0), 90.0)
+                    lng = (longitude + d_lng + 180.0) % 360.0 - 180.0
+                    cells.add(encode(lat, lng, precision))
+            return sorted(cells)
+    return None
+
+
+def haversine_km(latitude, longitude, latitudes, longitudes):
+    lat1 = np.radians(latitude)
+    lat2 = np.radians(latitudes)
+    d_lat = lat2 - lat1
+    d_lng = np.radians(longitudes) - np.radians(longitude)
+    a = np.sin(d_lat / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(d_lng / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+
+
+def nearby(latitude, longitude, radius_km, limit):
+    queryset = PostIndex.objects.exclude(geohash='')
+    cells = cover_cells(latitude, longitude, radius_km)
+    if cells:
+        condition = Q()
+        for cell in cells:
+            condition |= Q(geohash__startswith=cell)
+        queryset = queryset.filter(condition)
+
+    rows = list(queryset.values_list('post_type', 'post_id', 'latitude', 'longitude'))
+    if not rows:
+        return []
+
+    coordinates = np.array([(row[2], row[3]) for row in rows], dtype=np.float64)
+    distances = haversine_km(latitude, longitude, coordinates[:, 0], coordinates[:, 1])
+    inside = np.flatnonzero(distances <= radius_km)
+    closest = inside[np.argsort(distances[inside], kind='stable')][:limit]
+    return [(rows[i][0], rows[i][1], float(distances[i])) for i in closest.tolist()]
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from api.message_archive import ARCHIVE_AFTER_DAYS, archive_dir, archive_messages
+
+
+class Command(BaseCommand):
+    help = "Move old chat messages into gzipped NDJSON monthly segments"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--older-than-days', type=int, default=ARCHIVE_AFTER_DAYS)
+        parser.add_argument('--chunk-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        count = archive_messages(older_than_days=options['older_than_days'], chunk_size=options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(f"Archived {count} messages to {archive_dir()}"))
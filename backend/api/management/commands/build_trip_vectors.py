@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from api.recommendations import build_vectors, save_vectors, vectors_dir
+
+
+class Command(BaseCommand):
+    help = "Build the TF-IDF trip similarity matrix used by trip recommendations"
+
+    def handle(self, *args, **options):
+        ids, matrix = build_vectors()
+        save_vectors(ids, matrix)
+        self.stdout.write(self.style.SUCCESS(
+            f"Wrote {matrix.shape[0]}x{matrix.shape[1] if matrix.ndim == 2 else 0} trip vectors to {vectors_dir()}"
+        ))
@@ -0,0 +1,22 @@
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.management.base import BaseCommand, CommandError
+from api import autocomplete
+
+
+class Command(BaseCommand):
+    help = "Rebuild the in-memory user autocomplete index in every worker"
+
+    def handle(self, *args, **options):
+        # The bump reaches running workers only through a cache they share.
+        if isinstance(caches['default'], (LocMemCache, DummyCache)):
+            raise CommandError(
+                "The cache backend is local to this process, so running workers would never see the rebuild; "
+                "set CACHE_BACKEND to a shared backend (file, redis) or restart the workers instead"
+            )
+        autocomplete.invalidate()
+        index = autocomplete.get_index()
+        self.stdout.write(self.style.SUCCESS(
+            f"Indexed {len(index.user_keys)} users; running workers rebuild on their next lookup"
+        ))
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from api.conversations import rebuild
+
+
+class Command(BaseCommand):
+    help = "Rebuild the per-pair conversation summaries from direct messages"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        count = rebuild(chunk_size=options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {count} conversations"))
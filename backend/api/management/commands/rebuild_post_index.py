@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from api.post_index import rebuild
+
+
+class Command(BaseCommand):
+    help = "Rebuild the unified PostIndex table from the three post models"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        count = rebuild(chunk_size=options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(f"Indexed {count} posts"))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+from api.feeds import POST_TYPE_MODELS
+from api.search import rebuild
+
+
+class Command(BaseCommand):
+    help = "Rebuild the full-text search index for posts"
+
+    def handle(self, *args, **options):
+        count = rebuild(POST_TYPE_MODELS.values())
+        self.stdout.write(self.style.SUCCESS(f"Indexed {count} documents"))
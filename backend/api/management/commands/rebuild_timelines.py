@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from api.models import Follow, TimelineEntry
+from api.timeline import backfill_follow
+
+
+class Command(BaseCommand):
+    help = "Rebuild every user's materialized following timeline from the Follow graph"
+
+    def handle(self, *args, **options):
+        TimelineEntry.objects.all().delete()
+        follows = Follow.objects.values_list('follower_id', 'following_id')
+        count = 0
+        for follower_id, following_id in follows.iterator():
+            backfill_follow(follower_id, following_id)
+            count += 1
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt timelines from {count} follows"))
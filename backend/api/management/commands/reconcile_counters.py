@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from api.counters import reconcile_counters
+from api.feeds import POST_TYPE_MODELS
+
+
+class Command(BaseCommand):
+    help = "Recompute drifted like/comment/save counters on posts"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        for post_type in POST_TYPE_MODELS:
+            fixed = reconcile_counters(post_type, chunk_size=options['chunk_size'])
+            self.stdout.write(f"{post_type}: fixed {fixed} posts")
+        self.stdout.write(self.style.SUCCESS("Counters reconciled"))
@@ -0,0 +1,32 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from django.core.management.base import BaseCommand
+from api.outbox import drain, prune
+
+
+class Command(BaseCommand):
+    help = "Run queued side-effect jobs (image uploads) from the outbox"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4)
+        parser.add_argument('--batch-size', type=int, default=50)
+        parser.add_argument('--poll-interval', type=float, default=1.0)
+        parser.add_argument('--prune-interval', type=float, default=600.0, help="Seconds between prunes of finished jobs")
+        parser.add_argument('--once', action='store_true', help="Drain what is queued now, then exit")
+
+    def handle(self, *args, **options):
+        last_prune = 0.0
+        with ThreadPoolExecutor(max_workers=options['workers']) as executor:
+            while True:
+                claimed = drain(batch_size=options['batch_size'], executor=executor)
+                if claimed:
+                    continue
+                if time.monotonic() - last_prune >= options['prune_interval']:
+                    pruned = prune()
+                    last_prune = time.monotonic()
+                    if pruned:
+                        self.stdout.write(f"Pruned {pruned} finished jobs")
+                if options['once']:
+                    break
+                time.sleep(options['poll_interval'])
+        self.stdout.write(self.style.SUCCESS("Outbox drained"))
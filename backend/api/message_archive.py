@@ -0,0 +1,124 @@
+import gzip
+import json
+import os
+from datetime import datetime, timedelta
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.utils import timezone
+from .models import Message, MessageArchiveSegment
+
+User = get_user_model()
+
+
+ARCHIVE_AFTER_DAYS = getattr(settings, 'MESSAGE_ARCHIVE_AFTER_DAYS', 180)
+ARCHIVED_FIELDS = ('id', 'sender_id', 'receiver_id', 'group_id', 'content', 'created_at')
+
+
+def archive_dir():
+    return getattr(settings, 'MESSAGE_ARCHIVE_DIR', os.path.join(settings.BASE_DIR, 'message_archive'))
+
+
+def direct_thread(user_id, other_id):
+    return f"direct:{min(user_id, other_id)}:{max(user_id, other_id)}"
+
+
+def group_thread(group_id):
+    return f"group:{group_id}"
+
+
+def thread_of(row):
+    if row['group_id']:
+        return group_thread(row['group_id'])
+    return direct_thread(row['sender_id'], row['receiver_id'])
+
+
+def _write_segment(thread, month, rows):
+    relative_path = os.path.join(
+        f"{month:%Y-%m}", f"{thread.replace(':', '_')}-{rows[0]['id']}-{rows[-1]['id']}.ndjson.gz"
+    )
+    path = os.path.join(archive_dir(), relative_path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with gzip.open(f"{path}.tmp", 'wt', encoding='utf-8') as f:
+        for row in rows:
+            f.write(json.dumps(dict(row, created_at=row['created_at'].isoformat())) + '\n')
+    os.replace(f"{path}.tmp", path)
+    return MessageArchiveSegment(
+        thread=thread,
+        month=month,
+        path=relative_path,
+        first_message_id=rows[0]['id'],
+        last_message_id=rows[-1]['id'],
+        message_count=len(rows),
+    )
+
+
+def archive_messages(older_than_days=ARCHIVE_AFTER_DAYS, chunk_size=1000):
+    # Segment files are written before the rows are deleted, so a failed chunk
+    # leaves at worst an unindexed file behind, never a lost message.
+    cutoff = timezone.now() - timedelta(days=older_than_days)
+    archived = 0
+    while True:
+        chunk = list(
+            Message.objects.filter(created_at__lt=cutoff)
+            .order_by('id')
+            .values(*ARCHIVED_FIELDS)[:chunk_size]
+        )
+        if not chunk:
+            return archived
+
+        segments = {}
+        for row in chunk:
+            month = row['created_at'].date().replace(day=1)
+            segments.setdefault((thread_of(row), month), []).append(row)
+
+        written = [_write_segment(thread, month, rows) for (thread, month), rows in segments.items()]
+        with transaction.atomic():
+            MessageArchiveSegment.objects.bulk_create(written)
+            Message.objects.filter(id__in=[row['id'] for row in chunk]).delete()
+        archived += len(chunk)
+
+
+def _load_segment(segment):
+    with gzip.open(os.path.join(archive_dir(), segment.path), 'rt', encoding='utf-8') as f:
+        return [json.loads(line) for line in f]
+
+
+def _to_messages(rows):
+    senders = User.objects.in_bulk({row['sender_id'] for row in rows})
+    messages = []
+    for row in rows:
+        message = Message(**dict(row, created_at=datetime.fromisoformat(row['created_at'])))
+        message.sender = senders.get(row['sender_id'])
+        messages.append(message)
+    return [message for message in messages if message.sender is not None]
+
+
+def read_through(thread, messages, before=None, after=None, limit=50):
+    """Complete a hot-table history page with archived messages of the same thread.
+
+    `messages` is the page already read from Message, oldest first. Archived
+    messages are always older than hot ones, so only the older end is extended.
+    """
+    segments = MessageArchiveSegment.objects.filter(thread=thread)
+    if after is not None:
+        rows = []
+        for segment in segments.filter(last_message_id__gt=after).order_by('last_message_id'):
+            rows.extend(row for row in _load_segment(segment) if row['id'] > after)
+            if len(rows) >= limit:
+                break
+        return (_to_messages(rows) + messages)[:limit] if rows else messages
+
+    if len(messages) >= limit:
+        return messages
+    bound = messages[0].id if messages else before
+    if bound is not None:
+        segments = segments.filter(first_message_id__lt=bound)
+    rows = []
+    for segment in segments.order_by('-last_message_id'):
+        rows[:0] = [row for row in _load_segment(segment) if bound is None or row['id'] < bound]
+        if len(rows) + len(messages) >= limit:
+            break
+    if not rows:
+        return messages
+    return (_to_messages(rows) + messages)[-limit:]
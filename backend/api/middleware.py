@@ -0,0 +1,64 @@
+import time
+from urllib.parse import parse_qs
+from channels.db import database_sync_to_async
+from channels.middleware import BaseMiddleware
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+User = get_user_model()
+
+
+TOKEN_QUERY_PARAM = 'token'
+# Browsers can't set headers on a websocket, so the token may instead ride in
+# Sec-WebSocket-Protocol as ["access_token", "<jwt>"].
+TOKEN_SUBPROTOCOLS = ('access_token', 'bearer')
+# Upper bound on how long a deactivated user's sockets can still authenticate.
+USER_CACHE_TTL = 60
+
+
+def token_from_scope(scope):
+    """Return (raw token, subprotocol the consumer must echo back on accept)."""
+    query = parse_qs(scope.get('query_string', b'').decode())
+    if query.get(TOKEN_QUERY_PARAM):
+        return query[TOKEN_QUERY_PARAM][0], None
+    subprotocols = scope.get('subprotocols') or []
+    for marker, value in zip(subprotocols, subprotocols[1:]):
+        if marker.lower() in TOKEN_SUBPROTOCOLS:
+            return value, marker
+    return None, None
+
+
+@database_sync_to_async
+def get_user(raw_token):
+    try:
+        token = AccessToken(raw_token)
+        user_id = token[api_settings.USER_ID_CLAIM]
+        jti = token.get(api_settings.JTI_CLAIM)
+    except (TokenError, KeyError):
+        return AnonymousUser()
+
+    # Keyed by the verified token's jti for a short while, so a burst of
+    # reconnects with the same token costs one user lookup.
+    key = f"wsauth:{jti}" if jti else None
+    user = cache.get(key) if key else None
+    if user is None:
+        user = User.objects.filter(**{api_settings.USER_ID_FIELD: user_id}, is_active=True).first()
+        if user is None:
+            return AnonymousUser()
+        if key:
+            cache.set(key, user, max(min(int(token['exp'] - time.time()), USER_CACHE_TTL), 1))
+    return user
+
+
+class JWTAuthMiddleware(BaseMiddleware):
+
+    async def __call__(self, scope, receive, send):
+        scope = dict(scope)
+        raw_token, subprotocol = token_from_scope(scope)
+        scope['user'] = await get_user(raw_token) if raw_token else AnonymousUser()
+        scope['auth_subprotocol'] = subprotocol
+        return await super().__call__(scope, receive, send)
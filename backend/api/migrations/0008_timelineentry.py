@@ -0,0 +1,30 @@
+# Generated by Django 5.2.6 on 2026-10-18 07:54
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0007_alter_experiencedayimage_image_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TimelineEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('post_type', models.CharField(choices=[('experience', 'Experience'), ('general', 'General'), ('joinable', 'Joinable')], max_length=20)),
+                ('post_id', models.PositiveIntegerField()),
+                ('created_at', models.DateTimeField()),
+                ('author', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='timeline_entries', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', '-created_at'], name='api_timelin_user_id_99f59c_idx'), models.Index(fields=['post_type', 'post_id'], name='api_timelin_post_ty_ce250d_idx')],
+                'unique_together': {('user', 'post_type', 'post_id')},
+            },
+        ),
+    ]
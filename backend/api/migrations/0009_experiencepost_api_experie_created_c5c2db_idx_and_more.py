@@ -0,0 +1,25 @@
+# Generated by Django 5.2.6 on 2026-10-18 07:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0008_timelineentry'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='experiencepost',
+            index=models.Index(fields=['created_at'], name='api_experie_created_c5c2db_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='generalpost',
+            index=models.Index(fields=['created_at'], name='api_general_created_44647b_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='joinabletrippost',
+            index=models.Index(fields=['created_at'], name='api_joinabl_created_6ed448_idx'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.6 on 2026-10-18 07:59
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0010_experiencepost_comment_count_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostIndex',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('post_type', models.CharField(choices=[('experience', 'Experience'), ('general', 'General'), ('joinable', 'Joinable')], max_length=20)),
+                ('post_id', models.PositiveIntegerField()),
+                ('created_at', models.DateTimeField()),
+                ('latitude', models.FloatField(blank=True, null=True)),
+                ('longitude', models.FloatField(blank=True, null=True)),
+                ('status', models.CharField(blank=True, max_length=20)),
+                ('author', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='indexed_posts', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['author', 'created_at'], name='api_postind_author__3cb17b_idx'), models.Index(fields=['created_at'], name='api_postind_created_af0a0a_idx')],
+                'unique_together': {('post_type', 'post_id')},
+            },
+        ),
+    ]
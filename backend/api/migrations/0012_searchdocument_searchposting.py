@@ -0,0 +1,39 @@
+# Generated by Django 5.2.6 on 2026-10-18 08:03
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0011_postindex'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchDocument',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('doc_type', models.CharField(choices=[('user', 'User'), ('experience', 'Experience'), ('general', 'General'), ('joinable', 'Joinable')], max_length=20)),
+                ('doc_id', models.PositiveIntegerField()),
+                ('length', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'unique_together': {('doc_type', 'doc_id')},
+            },
+        ),
+        migrations.CreateModel(
+            name='SearchPosting',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('doc_type', models.CharField(choices=[('user', 'User'), ('experience', 'Experience'), ('general', 'General'), ('joinable', 'Joinable')], max_length=20)),
+                ('term', models.CharField(max_length=64)),
+                ('frequency', models.PositiveIntegerField(default=1)),
+                ('document', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='postings', to='api.searchdocument')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['doc_type', 'term'], name='api_searchp_doc_typ_2ae226_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.6 on 2026-10-18 08:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0012_searchdocument_searchposting'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='searchdocument',
+            name='doc_type',
+            field=models.CharField(choices=[('experience', 'Experience'), ('general', 'General'), ('joinable', 'Joinable')], max_length=20),
+        ),
+        migrations.AlterField(
+            model_name='searchposting',
+            name='doc_type',
+            field=models.CharField(choices=[('experience', 'Experience'), ('general', 'General'), ('joinable', 'Joinable')], max_length=20),
+        ),
+    ]
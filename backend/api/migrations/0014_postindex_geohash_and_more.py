@@ -0,0 +1,22 @@
+# Generated by Django 5.2.6 on 2026-10-18 08:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0013_alter_searchdocument_doc_type_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='postindex',
+            name='geohash',
+            field=models.CharField(blank=True, max_length=12),
+        ),
+        migrations.AddIndex(
+            model_name='postindex',
+            index=models.Index(fields=['geohash'], name='api_postind_geohash_e5bbc1_idx'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.6 on 2026-10-18 08:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0014_postindex_geohash_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='joinabletrippost',
+            index=models.Index(fields=['status', 'start_date', 'end_date'], name='api_joinabl_status_f07138_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='joinabletrippost',
+            index=models.Index(fields=['status', 'budget'], name='api_joinabl_status_08e973_idx'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.6 on 2026-10-18 08:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0015_joinabletrippost_api_joinabl_status_f07138_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(fields=['sender', 'receiver', 'created_at'], name='api_message_sender__c8a439_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(fields=['group', 'created_at'], name='api_message_group_i_ac7f96_idx'),
+        ),
+    ]
@@ -0,0 +1,66 @@
+# Generated by Django 5.2.6 on 2026-10-18 08:17
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def build_conversations(apps, schema_editor):
+    # One summary per direct-message pair; unread counts come from Message.is_read,
+    # which 0018 turns into read cursors before dropping it.
+    Conversation = apps.get_model('api', 'Conversation')
+    Message = apps.get_model('api', 'Message')
+
+    summaries = {}
+    messages = (
+        Message.objects.filter(receiver__isnull=False)
+        .order_by('id')
+        .values_list('id', 'sender_id', 'receiver_id', 'content', 'created_at', 'is_read')
+    )
+    for message_id, sender_id, receiver_id, content, created_at, is_read in messages.iterator(chunk_size=1000):
+        key = (min(sender_id, receiver_id), max(sender_id, receiver_id))
+        summary = summaries.setdefault(key, {'first_unread': 0, 'second_unread': 0})
+        summary.update(
+            last_message_id=message_id,
+            last_message_preview=content[:255],
+            last_activity_at=created_at,
+        )
+        if sender_id != receiver_id and not is_read:
+            reader = 'first' if receiver_id == key[0] else 'second'
+            summary[f'{reader}_unread'] += 1
+
+    Conversation.objects.bulk_create(
+        [
+            Conversation(first_user_id=first_id, second_user_id=second_id, **summary)
+            for (first_id, second_id), summary in summaries.items()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0016_message_api_message_sender__c8a439_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Conversation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('last_message_id', models.PositiveBigIntegerField(default=0)),
+                ('last_message_preview', models.CharField(blank=True, default='', max_length=255)),
+                ('last_activity_at', models.DateTimeField()),
+                ('first_unread', models.PositiveIntegerField(default=0)),
+                ('second_unread', models.PositiveIntegerField(default=0)),
+                ('first_user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('second_user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['first_user', '-last_activity_at'], name='api_convers_first_u_c602ca_idx'), models.Index(fields=['second_user', '-last_activity_at'], name='api_convers_second__2a97ff_idx')],
+                'unique_together': {('first_user', 'second_user')},
+            },
+        ),
+        migrations.RunPython(build_conversations, migrations.RunPython.noop),
+    ]
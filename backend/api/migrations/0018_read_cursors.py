@@ -0,0 +1,65 @@
+# Generated by Django 5.2.6 on 2026-10-18 08:19
+
+from django.db import migrations, models
+
+
+def seed_read_cursors(apps, schema_editor):
+    Conversation = apps.get_model('api', 'Conversation')
+    Message = apps.get_model('api', 'Message')
+    TripGroupMember = apps.get_model('api', 'TripGroupMember')
+
+    for conversation in Conversation.objects.iterator():
+        for side, reader_id, partner_id in (
+            ('first', conversation.first_user_id, conversation.second_user_id),
+            ('second', conversation.second_user_id, conversation.first_user_id),
+        ):
+            # Messages to yourself never count as unread.
+            if reader_id == partner_id:
+                setattr(conversation, f'{side}_last_read_message_id', conversation.last_message_id)
+                setattr(conversation, f'{side}_unread', 0)
+                continue
+            received = Message.objects.filter(sender_id=partner_id, receiver_id=reader_id)
+            first_unread = received.filter(is_read=False).order_by('id').values_list('id', flat=True).first()
+            cursor = first_unread - 1 if first_unread else conversation.last_message_id
+            setattr(conversation, f'{side}_last_read_message_id', cursor)
+            setattr(conversation, f'{side}_unread', received.filter(id__gt=cursor).count())
+        conversation.save()
+
+    # Group messages never had read state; start every member at the latest message.
+    latest = Message.objects.filter(group__isnull=False).values('group_id').annotate(last_id=models.Max('id'))
+    for row in latest:
+        TripGroupMember.objects.filter(group_id=row['group_id']).update(last_read_message_id=row['last_id'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0017_conversation'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='conversation',
+            name='first_last_read_message_id',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='conversation',
+            name='second_last_read_message_id',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='tripgroupmember',
+            name='last_read_message_id',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(fields=['group', 'id'], name='api_message_group_i_c4feb6_idx'),
+        ),
+        migrations.RunPython(seed_read_cursors, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='message',
+            name='is_read',
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.6 on 2026-10-18 08:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0018_read_cursors'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MessageArchiveSegment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('thread', models.CharField(max_length=40)),
+                ('month', models.DateField()),
+                ('path', models.CharField(max_length=255)),
+                ('first_message_id', models.PositiveBigIntegerField()),
+                ('last_message_id', models.PositiveBigIntegerField()),
+                ('message_count', models.PositiveIntegerField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['thread', 'last_message_id'], name='api_message_thread_6ce695_idx')],
+            },
+        ),
+    ]
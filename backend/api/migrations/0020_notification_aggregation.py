@@ -0,0 +1,43 @@
+# Generated by Django 5.2.6 on 2026-10-18 08:29
+
+from django.db import migrations, models
+
+
+def copy_created_at(apps, schema_editor):
+    Notification = apps.get_model('api', 'Notification')
+    Notification.objects.update(updated_at=models.F('created_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0019_messagearchivesegment'),
+        ('contenttypes', '0002_remove_content_type_name'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notification',
+            name='actor_count',
+            field=models.PositiveIntegerField(default=1),
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='actor_ids',
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.RunPython(copy_created_at, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['receiver', 'notification_type', 'object_id', 'updated_at'], name='api_notific_receive_d48839_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['receiver', '-updated_at'], name='api_notific_receive_bd4aee_idx'),
+        ),
+    ]
@@ -0,0 +1,44 @@
+from django.db import migrations
+
+from api.geo import encode
+
+
+def backfill_post_index(apps, schema_editor):
+    PostIndex = apps.get_model('api', 'PostIndex')
+    sources = (
+        ('experience', apps.get_model('api', 'ExperiencePost'), 'author_id'),
+        ('general', apps.get_model('api', 'GeneralPost'), 'author_id'),
+        ('joinable', apps.get_model('api', 'JoinableTripPost'), 'creator_id'),
+    )
+    for post_type, model, author_field in sources:
+        indexed = set(PostIndex.objects.filter(post_type=post_type).values_list('post_id', flat=True))
+        batch = []
+        for post in model.objects.iterator(chunk_size=1000):
+            if post.id in indexed:
+                continue
+            has_location = post.latitude is not None and post.longitude is not None
+            batch.append(PostIndex(
+                post_type=post_type,
+                post_id=post.id,
+                author_id=getattr(post, author_field),
+                created_at=post.created_at,
+                latitude=post.latitude,
+                longitude=post.longitude,
+                geohash=encode(float(post.latitude), float(post.longitude)) if has_location else '',
+                status=getattr(post, 'status', ''),
+            ))
+            if len(batch) >= 1000:
+                PostIndex.objects.bulk_create(batch)
+                batch = []
+        PostIndex.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0021_outboxjob'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_post_index, migrations.RunPython.noop),
+    ]
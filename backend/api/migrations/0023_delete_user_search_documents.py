@@ -0,0 +1,20 @@
+from django.db import migrations
+
+
+def delete_user_documents(apps, schema_editor):
+    # Users are served by the autocomplete index now; drop their full-text rows.
+    SearchPosting = apps.get_model('api', 'SearchPosting')
+    SearchDocument = apps.get_model('api', 'SearchDocument')
+    SearchPosting.objects.filter(doc_type='user').delete()
+    SearchDocument.objects.filter(doc_type='user').delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0022_backfill_postindex'),
+    ]
+
+    operations = [
+        migrations.RunPython(delete_user_documents, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.6 on 2026-10-18 08:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0023_delete_user_search_documents'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='message',
+            name='api_message_sender__c8a439_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='message',
+            name='api_message_group_i_ac7f96_idx',
+        ),
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(fields=['sender', 'receiver', 'id'], name='api_message_sender__9b8c19_idx'),
+        ),
+    ]
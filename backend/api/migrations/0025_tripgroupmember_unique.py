@@ -0,0 +1,38 @@
+# Generated by Django 5.2.6 on 2026-10-18 08:52
+
+from django.db import migrations, models
+
+
+def merge_duplicate_memberships(apps, schema_editor):
+    # Keep the oldest row per (group, user), carrying over an admin role and the furthest read cursor.
+    TripGroupMember = apps.get_model('api', 'TripGroupMember')
+    duplicates = (
+        TripGroupMember.objects.values('group_id', 'user_id')
+        .annotate(rows=models.Count('id'))
+        .filter(rows__gt=1)
+    )
+    for pair in duplicates:
+        memberships = list(
+            TripGroupMember.objects.filter(group_id=pair['group_id'], user_id=pair['user_id']).order_by('id')
+        )
+        keep, extra = memberships[0], memberships[1:]
+        if any(membership.role == 'admin' for membership in memberships):
+            keep.role = 'admin'
+        keep.last_read_message_id = max(membership.last_read_message_id for membership in memberships)
+        keep.save()
+        TripGroupMember.objects.filter(id__in=[membership.id for membership in extra]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0024_message_history_id_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_memberships, migrations.RunPython.noop),
+        migrations.AlterUniqueTogether(
+            name='tripgroupmember',
+            unique_together={('group', 'user')},
+        ),
+    ]
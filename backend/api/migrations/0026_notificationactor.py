@@ -0,0 +1,43 @@
+# Generated by Django 5.2.6 on 2026-10-18 08:55
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def seed_actors(apps, schema_editor):
+    # Actors that already fell out of actor_ids cannot be recovered; the rest are carried over.
+    Notification = apps.get_model('api', 'Notification')
+    NotificationActor = apps.get_model('api', 'NotificationActor')
+    User = apps.get_model(*settings.AUTH_USER_MODEL.split('.'))
+    batch = []
+    for notification in Notification.objects.filter(notification_type__in=['like', 'comment', 'follow']).iterator():
+        actor_ids = set(notification.actor_ids or [notification.sender_id])
+        existing = set(User.objects.filter(id__in=actor_ids).values_list('id', flat=True))
+        batch.extend(NotificationActor(notification_id=notification.id, user_id=user_id) for user_id in existing)
+        if len(batch) >= 1000:
+            NotificationActor.objects.bulk_create(batch)
+            batch = []
+    NotificationActor.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0025_tripgroupmember_unique'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificationActor',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('notification', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='actors', to='api.notification')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='notification_actions', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'unique_together': {('notification', 'user')},
+            },
+        ),
+        migrations.RunPython(seed_actors, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,52 @@
+from django.db import migrations
+from django.db.models import Count
+
+from api.timeline import BACKFILL_POSTS, FANOUT_MAX_FOLLOWERS
+
+
+def backfill_timelines(apps, schema_editor):
+    # Each follower gets the author's recent posts, as a new follow would;
+    # high-follower authors are merged at read time and get no rows.
+    Follow = apps.get_model('api', 'Follow')
+    PostIndex = apps.get_model('api', 'PostIndex')
+    TimelineEntry = apps.get_model('api', 'TimelineEntry')
+
+    follower_counts = dict(
+        Follow.objects.order_by().values_list('following_id').annotate(n=Count('id'))
+    )
+    recent_by_author = {}
+    batch = []
+    for follower_id, author_id in Follow.objects.values_list('follower_id', 'following_id').iterator():
+        if follower_counts[author_id] > FANOUT_MAX_FOLLOWERS:
+            continue
+        if author_id not in recent_by_author:
+            recent_by_author[author_id] = list(
+                PostIndex.objects.filter(author_id=author_id)
+                .order_by('-created_at')
+                .values_list('post_type', 'post_id', 'created_at')[:BACKFILL_POSTS]
+            )
+        batch.extend(
+            TimelineEntry(
+                user_id=follower_id,
+                author_id=author_id,
+                post_type=post_type,
+                post_id=post_id,
+                created_at=created_at,
+            )
+            for post_type, post_id, created_at in recent_by_author[author_id]
+        )
+        if len(batch) >= 1000:
+            TimelineEntry.objects.bulk_create(batch, ignore_conflicts=True)
+            batch = []
+    TimelineEntry.objects.bulk_create(batch, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0026_notificationactor'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_timelines, migrations.RunPython.noop),
+    ]
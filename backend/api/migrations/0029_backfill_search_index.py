@@ -0,0 +1,58 @@
+from collections import Counter
+
+from django.db import migrations
+
+from api.search import DOCUMENT_FIELDS, analyze
+
+
+def backfill_search_index(apps, schema_editor):
+    # Posts written before the index existed; ones indexed since are left as they are.
+    SearchDocument = apps.get_model('api', 'SearchDocument')
+    SearchPosting = apps.get_model('api', 'SearchPosting')
+    sources = (
+        ('experience', apps.get_model('api', 'ExperiencePost')),
+        ('general', apps.get_model('api', 'GeneralPost')),
+        ('joinable', apps.get_model('api', 'JoinableTripPost')),
+    )
+    for doc_type, model in sources:
+        indexed = set(SearchDocument.objects.filter(doc_type=doc_type).values_list('doc_id', flat=True))
+        fields = DOCUMENT_FIELDS[doc_type]
+        batch = {}
+        for post in model.objects.only('id', *fields).iterator(chunk_size=1000):
+            if post.id in indexed:
+                continue
+            batch[post.id] = analyze(' '.join(str(getattr(post, field) or '') for field in fields))
+            if len(batch) >= 1000:
+                _write(SearchDocument, SearchPosting, doc_type, batch)
+                batch = {}
+        _write(SearchDocument, SearchPosting, doc_type, batch)
+
+
+def _write(SearchDocument, SearchPosting, doc_type, terms_by_id):
+    documents = SearchDocument.objects.bulk_create([
+        SearchDocument(doc_type=doc_type, doc_id=doc_id, length=len(terms))
+        for doc_id, terms in terms_by_id.items()
+    ])
+    # bulk_create does not return primary keys on MySQL, so the rows are read back.
+    document_ids = dict(
+        SearchDocument.objects.filter(doc_type=doc_type, doc_id__in=terms_by_id).values_list('doc_id', 'id')
+    )
+    SearchPosting.objects.bulk_create(
+        [
+            SearchPosting(document_id=document_ids[document.doc_id], doc_type=doc_type, term=term, frequency=frequency)
+            for document in documents
+            for term, frequency in Counter(terms_by_id[document.doc_id]).items()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0028_outboxupload'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_search_index, migrations.RunPython.noop),
+    ]
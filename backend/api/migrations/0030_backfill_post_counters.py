@@ -0,0 +1,49 @@
+from django.db import migrations
+from django.db.models import Count
+
+
+def backfill_post_counters(apps, schema_editor):
+    # Counters are set from the rows themselves, the same as reconcile_counters.
+    ContentType = apps.get_model('contenttypes', 'ContentType')
+    sources = {
+        'like_count': apps.get_model('api', 'Like'),
+        'comment_count': apps.get_model('api', 'Comment'),
+        'save_count': apps.get_model('api', 'SavedPost'),
+    }
+    for model_name in ('experiencepost', 'generalpost', 'joinabletrippost'):
+        content_type = ContentType.objects.filter(app_label='api', model=model_name).first()
+        if content_type is None:
+            continue
+        model = apps.get_model('api', model_name)
+
+        counts = {}
+        for field, source in sources.items():
+            rows = (
+                source.objects.filter(content_type=content_type)
+                .order_by()
+                .values('object_id')
+                .annotate(n=Count('id'))
+                .values_list('object_id', 'n')
+            )
+            for object_id, n in rows:
+                counts.setdefault(object_id, {})[field] = n
+
+        ids = sorted(counts)
+        for start in range(0, len(ids), 1000):
+            posts = list(model.objects.filter(id__in=ids[start:start + 1000]).only('id', *sources))
+            for post in posts:
+                for field in sources:
+                    setattr(post, field, counts[post.id].get(field, 0))
+            model.objects.bulk_update(posts, list(sources))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0029_backfill_search_index'),
+        ('contenttypes', '0002_remove_content_type_name'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_post_counters, migrations.RunPython.noop),
+    ]
@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 from django.contrib.auth.models import AbstractUser
 from django.contrib.contenttypes.fields import GenericForeignKey
 from django.contrib.contenttypes.models import ContentType
@@ -62,6 +63,17 @@ class JoinableTripPost(models.Model):
     latitude = models.FloatField(null=True, blank=True)
     longitude = models.FloatField(null=True, blank=True)
 
+    like_count = models.PositiveIntegerField(default=0)
+    comment_count = models.PositiveIntegerField(default=0)
+    save_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at']),
+            models.Index(fields=['status', 'start_date', 'end_date']),
+            models.Index(fields=['status', 'budget']),
+        ]
+
     def __str__(self):
         return f"{self.title} - {self.destination}"
 
@@ -116,6 +128,10 @@ class TripGroupMember(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='trip_group_memberships')
     role = models.CharField(max_length=10, choices=ROLE_CHOICES, default='member')
     joined_at = models.DateTimeField(auto_now_add=True)
+    last_read_message_id = models.PositiveBigIntegerField(default=0)
+
+    class Meta:
+        unique_together = ('group', 'user')
 
     def __str__(self):
         return f"{self.user} in {self.group}"
@@ -135,6 +151,13 @@ class ExperiencePost(models.Model):
     latitude = models.FloatField(null=True, blank=True)
     longitude = models.FloatField(null=True, blank=True)
 
+    like_count = models.PositiveIntegerField(default=0)
+    comment_count = models.PositiveIntegerField(default=0)
+    save_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        indexes = [models.Index(fields=['created_at'])]
+
     def __str__(self):
         return self.title
 
@@ -176,6 +199,13 @@ class GeneralPost(models.Model):
     latitude = models.FloatField(null=True, blank=True)
     longitude = models.FloatField(null=True, blank=True)
 
+    like_count = models.PositiveIntegerField(default=0)
+    comment_count = models.PositiveIntegerField(default=0)
+    save_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        indexes = [models.Index(fields=['created_at'])]
+
     def __str__(self):
         return f"Post by {self.author}"
 
@@ -242,12 +272,61 @@ class Message(models.Model):
 
     content = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
-    is_read = models.BooleanField(default=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['sender', 'receiver', 'id']),
+            models.Index(fields=['group', 'id']),
+        ]
 
     def __str__(self):
         return f"{self.sender.username}: {self.content[:30]}"
 
 
+class MessageArchiveSegment(models.Model):
+    # A gzipped NDJSON file of one thread's archived messages from one month.
+    # thread is "direct:<low user id>:<high user id>" or "group:<trip group id>".
+    thread = models.CharField(max_length=40)
+    month = models.DateField()
+    path = models.CharField(max_length=255)
+    first_message_id = models.PositiveBigIntegerField()
+    last_message_id = models.PositiveBigIntegerField()
+    message_count = models.PositiveIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['thread', 'last_message_id'])]
+
+    def __str__(self):
+        return f"{self.thread} {self.month:%Y-%m}"
+
+
+class Conversation(models.Model):
+    # One row per direct-message pair, stored with first_user_id < second_user_id.
+    first_user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    second_user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+
+    last_message_id = models.PositiveBigIntegerField(default=0)
+    last_message_preview = models.CharField(max_length=255, blank=True, default='')
+    last_activity_at = models.DateTimeField()
+    # Each side reads up to its cursor; its unread counter is kept equal to the
+    # number of messages it received with a higher id.
+    first_last_read_message_id = models.PositiveBigIntegerField(default=0)
+    second_last_read_message_id = models.PositiveBigIntegerField(default=0)
+    first_unread = models.PositiveIntegerField(default=0)
+    second_unread = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ('first_user', 'second_user')
+        indexes = [
+            models.Index(fields=['first_user', '-last_activity_at']),
+            models.Index(fields=['second_user', '-last_activity_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.first_user} <-> {self.second_user}"
+
+
 # ================= NOTIFICATIONS ================= #
 
 class Notification(models.Model):
@@ -267,14 +346,38 @@ class Notification(models.Model):
 
     is_read = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE, null=True, blank=True)
     object_id = models.PositiveIntegerField(null=True, blank=True)
 
+    # Likes, comments and follows on the same target are coalesced into one row:
+    # sender is the latest actor, actor_ids the few most recent distinct actors
+    # shown in the list, and NotificationActor every actor counted so far.
+    actor_count = models.PositiveIntegerField(default=1)
+    actor_ids = models.JSONField(default=list, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['receiver', 'notification_type', 'object_id', 'updated_at']),
+            models.Index(fields=['receiver', '-updated_at']),
+        ]
+
     def __str__(self):
         return f"{self.sender} -> {self.receiver}: {self.notification_type}"
 
 
+class NotificationActor(models.Model):
+    notification = models.ForeignKey(Notification, on_delete=models.CASCADE, related_name='actors')
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='notification_actions')
+
+    class Meta:
+        unique_together = ('notification', 'user')
+
+    def __str__(self):
+        return f"{self.user} on notification {self.notification_id}"
+
+
 # ================= STORIES ================= #
 
 class Story(models.Model):
@@ -302,4 +405,115 @@ class StoryView(models.Model):
     viewed_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
-        unique_together = ('story', 'viewer')
\ No newline at end of file
+        unique_together = ('story', 'viewer')
+
+# ================= TIMELINE ================= #
+
+class TimelineEntry(models.Model):
+    POST_TYPE_CHOICES = [
+        ('experience', 'Experience'),
+        ('general', 'General'),
+        ('joinable', 'Joinable'),
+    ]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='timeline_entries')
+    author = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    post_type = models.CharField(max_length=20, choices=POST_TYPE_CHOICES)
+    post_id = models.PositiveIntegerField()
+    created_at = models.DateTimeField()
+
+    class Meta:
+        unique_together = ('user', 'post_type', 'post_id')
+        indexes = [
+            models.Index(fields=['user', '-created_at']),
+            models.Index(fields=['post_type', 'post_id']),
+        ]
+
+    def __str__(self):
+        return f"{self.post_type} {self.post_id} in {self.user}'s timeline"
+
+
+# ================= POST INDEX ================= #
+
+class PostIndex(models.Model):
+    post_type = models.CharField(max_length=20, choices=TimelineEntry.POST_TYPE_CHOICES)
+    post_id = models.PositiveIntegerField()
+    author = models.ForeignKey(User, on_delete=models.CASCADE, related_name='indexed_posts')
+    created_at = models.DateTimeField()
+
+    latitude = models.FloatField(null=True, blank=True)
+    longitude = models.FloatField(null=True, blank=True)
+    geohash = models.CharField(max_length=12, blank=True)
+    status = models.CharField(max_length=20, blank=True)
+
+    class Meta:
+        unique_together = ('post_type', 'post_id')
+        indexes = [
+            models.Index(fields=['author', 'created_at']),
+            models.Index(fields=['created_at']),
+            models.Index(fields=['geohash']),
+        ]
+
+    def __str__(self):
+        return f"{self.post_type} {self.post_id}"
+
+
+# ================= SEARCH ================= #
+
+class SearchDocument(models.Model):
+    doc_type = models.CharField(max_length=20, choices=TimelineEntry.POST_TYPE_CHOICES)
+    doc_id = models.PositiveIntegerField()
+    length = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ('doc_type', 'doc_id')
+
+    def __str__(self):
+        return f"{self.doc_type} {self.doc_id}"
+
+
+class SearchPosting(models.Model):
+    document = models.ForeignKey(SearchDocument, on_delete=models.CASCADE, related_name='postings')
+    doc_type = models.CharField(max_length=20, choices=TimelineEntry.POST_TYPE_CHOICES)
+    term = models.CharField(max_length=64)
+    frequency = models.PositiveIntegerField(default=1)
+
+    class Meta:
+        indexes = [models.Index(fields=['doc_type', 'term'])]
+
+    def __str__(self):
+        return f"{self.term} in {self.document}"
+
+
+class OutboxJob(models.Model):
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+
+    kind = models.CharField(max_length=50)
+    payload = models.JSONField(default=dict)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveIntegerField(default=0)
+    available_at = models.DateTimeField(default=timezone.now)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['status', 'available_at'])]
+
+    def __str__(self):
+        return f"{self.kind} #{self.id} ({self.status})"
+
+
+class OutboxUpload(models.Model):
+    # An uploaded image held in the database until its upload_image job sends
+    # it to Cloudinary, so any worker on any host can read it.
+    data = models.BinaryField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"upload #{self.id} ({len(self.data)} bytes)"
@@ -0,0 +1,89 @@
+from django.contrib.auth import get_user_model
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import Max, Prefetch, Q
+from .models import Comment, ExperiencePost, GeneralPost, JoinableTripPost
+from .notifications import RECENT_ACTORS, actor_ids_of
+
+User = get_user_model()
+
+
+TARGETED_TYPES = ('like', 'comment')
+POST_MODELS = (ExperiencePost, GeneralPost, JoinableTripPost)
+
+
+class NotificationTargets:
+    """Posts, comment texts and recent actors behind a page of notifications.
+
+    One query per post content type (images prefetched), one for the latest
+    comment of each (post, sender) and one for the actors.
+    """
+
+    def __init__(self, notifications):
+        notifications = list(notifications)
+        self.notification_ids = {notification.id for notification in notifications}
+        targeted = [
+            notification for notification in notifications
+            if notification.notification_type in TARGETED_TYPES and notification.content_type_id and notification.object_id
+        ]
+
+        ids_by_type = {}
+        for notification in targeted:
+            ids_by_type.setdefault(notification.content_type_id, set()).add(notification.object_id)
+        self.posts = {}
+        for ct_id, object_ids in ids_by_type.items():
+            model = ContentType.objects.get_for_id(ct_id).model_class()
+            if model not in POST_MODELS:
+                continue
+            queryset = model.objects.filter(pk__in=object_ids)
+            if hasattr(model, 'images'):
+                image_model = model.images.rel.related_model
+                queryset = queryset.prefetch_related(Prefetch('images', queryset=image_model.objects.order_by('id')))
+            for post in queryset:
+                self.posts[(ct_id, post.pk)] = post
+
+        comment_keys = {
+            (notification.content_type_id, notification.object_id, notification.sender_id)
+            for notification in targeted if notification.notification_type == 'comment'
+        }
+        self.comment_texts = {}
+        if comment_keys:
+            match = Q()
+            for ct_id, object_id, user_id in comment_keys:
+                match |= Q(content_type_id=ct_id, object_id=object_id, user_id=user_id)
+            latest_ids = Comment.objects.filter(match).values('content_type', 'object_id', 'user').annotate(
+                latest_id=Max('id')
+            ).values('latest_id')
+            for comment in Comment.objects.filter(id__in=latest_ids).values('content_type_id', 'object_id', 'user_id', 'text'):
+                self.comment_texts[(comment['content_type_id'], comment['object_id'], comment['user_id'])] = comment['text']
+
+        self.actors = User.objects.in_bulk({
+            actor_id
+            for notification in notifications
+            for actor_id in actor_ids_of(notification)[:RECENT_ACTORS]
+        })
+
+    def covers(self, notification):
+        return notification.id in self.notification_ids
+
+    def post(self, notification):
+        if notification.notification_type not in TARGETED_TYPES:
+            return None
+        return self.posts.get((notification.content_type_id, notification.object_id))
+
+    def thumbnail(self, notification):
+        post = self.post(notification)
+        if post is None:
+            return None
+        image = getattr(post, 'cover_image', None)
+        if not image and hasattr(post, 'images'):
+            images = post.images.all()
+            image = images[0].image if images else None
+        return image or None
+
+    def comment_text(self, notification):
+        if notification.notification_type != 'comment':
+            return None
+        return self.comment_texts.get((notification.content_type_id, notification.object_id, notification.sender_id))
+
+    def recent_actors(self, notification):
+        return [self.actors[pk] for pk in actor_ids_of(notification)[:RECENT_ACTORS] if pk in self.actors]
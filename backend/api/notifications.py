@@ -0,0 +1,124 @@
+from datetime import timedelta
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.utils import timezone
+from .models import Notification, NotificationActor
+
+
+AGGREGATION_WINDOW = timedelta(hours=getattr(settings, 'NOTIFICATION_AGGREGATION_HOURS', 24))
+AGGREGATED_VERBS = {
+    'like': 'liked your post',
+    'comment': 'commented on your post',
+    'follow': 'started following you',
+}
+RECENT_ACTORS = 3
+
+
+# NotificationConsumer joins user_<id> and relays event["message"] as-is.
+def notification_group(user_id):
+    return f"user_{user_id}"
+
+
+def aggregated_text(sender, actor_count, notification_type):
+    others = actor_count - 1
+    if others == 1:
+        return f"{sender.username} and 1 other {AGGREGATED_VERBS[notification_type]}"
+    if others > 1:
+        return f"{sender.username} and {others} others {AGGREGATED_VERBS[notification_type]}"
+    return f"{sender.username} {AGGREGATED_VERBS[notification_type]}"
+
+
+def actor_ids_of(notification):
+    return notification.actor_ids or [notification.sender_id]
+
+
+def notify(sender, receiver, notification_type, target=None):
+    """Create a like/comment/follow notification, or fold it into a recent one on the same target."""
+    target_fields = {
+        'content_type': ContentType.objects.get_for_model(target) if target is not None else None,
+        'object_id': target.pk if target is not None else None,
+    }
+    with transaction.atomic():
+        notification = Notification.objects.select_for_update().filter(
+            receiver=receiver,
+            notification_type=notification_type,
+            updated_at__gte=timezone.now() - AGGREGATION_WINDOW,
+            **target_fields
+        ).order_by('-updated_at').first()
+
+        if notification is None:
+            notification = Notification.objects.create(
+                sender=sender,
+                receiver=receiver,
+                notification_type=notification_type,
+                text=aggregated_text(sender, 1, notification_type),
+                actor_ids=[sender.id],
+                **target_fields
+            )
+            NotificationActor.objects.create(notification=notification, user=sender)
+            return notification
+
+        # Every counted actor has a row, so a re-like or a repeat comment from
+        # someone already counted changes nothing however many actors there are.
+        _, new_actor = NotificationActor.objects.get_or_create(notification=notification, user=sender)
+        if not new_actor:
+            return notification
+        notification.sender = sender
+        notification.actor_count += 1
+        notification.actor_ids = [sender.id, *actor_ids_of(notification)][:RECENT_ACTORS]
+        notification.text = aggregated_text(sender, notification.actor_count, notification_type)
+        notification.is_read = False
+        notification.save(update_fields=['sender', 'actor_count', 'actor_ids', 'text', 'is_read', 'updated_at'])
+        return notification
+
+
+def unread_count(user_id):
+    return Notification.objects.filter(receiver_id=user_id, is_read=False).count()
+
+
+def _send(user_id, message):
+    channel_layer = get_channel_layer()
+    if channel_layer is None:
+        return
+    async_to_sync(channel_layer.group_send)(
+        notification_group(user_id),
+        {'type': 'send_notification', 'message': message}
+    )
+
+
+def payload(notification):
+    sender = notification.sender
+    return {
+        'type': 'notification',
+        'notification': {
+            'id': notification.id,
+            'notification_type': notification.notification_type,
+            'text': notification.text,
+            'object_id': notification.object_id,
+            'actor_count': notification.actor_count,
+            'created_at': notification.created_at.isoformat(),
+            'updated_at': notification.updated_at.isoformat(),
+            'sender': {
+                'id': sender.id,
+                'username': sender.username,
+                'profile_pic': sender.profile_pic.url if sender.profile_pic else None,
+            },
+        },
+        'unread_count': unread_count(notification.receiver_id),
+    }
+
+
+def push(notification):
+    _send(notification.receiver_id, payload(notification))
+
+
+def push_unread_count(user_id):
+    _send(user_id, {'type': 'unread_count', 'unread_count': unread_count(user_id)})
+
+
+def dispatch(notification):
+    # Only after commit, so a rolled-back like or follow never reaches a socket.
+    transaction.on_commit(lambda: push(notification))
@@ -0,0 +1,137 @@
+import os
+from datetime import timedelta
+from django.apps import apps
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import close_old_connections, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from django.utils.text import get_valid_filename
+from .models import OutboxJob, OutboxUpload
+
+
+# Side effects are written as OutboxJob rows in the caller's transaction and run
+# later by `manage.py run_outbox`, so they commit or roll back with the request.
+MAX_ATTEMPTS = 5
+MAX_BACKOFF_SECONDS = 300
+# A claimed job nobody has started (or whose worker died) after this long is claimed again.
+LEASE = timedelta(minutes=5)
+# Done jobs and orphaned staged uploads are deleted by prune() after this long.
+RETENTION = timedelta(hours=getattr(settings, 'OUTBOX_RETENTION_HOURS', 72))
+
+HANDLERS = {}
+
+
+def handler(kind):
+    def register(func):
+        HANDLERS[kind] = func
+        return func
+    return register
+
+
+def enqueue(kind, **payload):
+    return OutboxJob.objects.create(kind=kind, payload=payload)
+
+
+def claim(batch_size):
+    now = timezone.now()
+    with transaction.atomic():
+        ids = list(
+            OutboxJob.objects.select_for_update(skip_locked=True)
+            .filter(Q(status='pending', available_at__lte=now) | Q(status='running', locked_at__lt=now - LEASE))
+            .order_by('id')
+            .values_list('id', flat=True)[:batch_size]
+        )
+        OutboxJob.objects.filter(id__in=ids).update(status='running', locked_at=now, attempts=F('attempts') + 1)
+    return list(OutboxJob.objects.filter(id__in=ids).order_by('id'))
+
+
+def run_job(job):
+    close_old_connections()
+    try:
+        with transaction.atomic():
+            # The row stays locked while the handler runs, and claim() skips
+            # locked rows, so a slow job is never handed to a second worker;
+            # the lease only frees jobs whose worker (and connection) died.
+            # A changed attempts count means another worker reclaimed it first.
+            owned = OutboxJob.objects.select_for_update(skip_locked=True).filter(
+                pk=job.pk, status='running', attempts=job.attempts
+            ).values_list('id', flat=True)
+            if not list(owned):
+                return False
+            try:
+                with transaction.atomic():
+                    HANDLERS[job.kind](**job.payload)
+            except Exception as e:
+                if job.attempts >= MAX_ATTEMPTS:
+                    changes = {'status': 'failed'}
+                else:
+                    delay = min(2 ** job.attempts, MAX_BACKOFF_SECONDS)
+                    changes = {'status': 'pending', 'available_at': timezone.now() + timedelta(seconds=delay)}
+                OutboxJob.objects.filter(pk=job.pk).update(locked_at=None, last_error=f"{type(e).__name__}: {e}", **changes)
+                return False
+            OutboxJob.objects.filter(pk=job.pk).update(status='done', locked_at=None, last_error='')
+            return True
+    finally:
+        close_old_connections()
+
+
+def prune(chunk_size=1000):
+    """Delete finished jobs past the retention window and staged uploads no queued job refers to."""
+    cutoff = timezone.now() - RETENTION
+    deleted = 0
+    while True:
+        ids = list(OutboxJob.objects.filter(status='done', available_at__lt=cutoff).values_list('id', flat=True)[:chunk_size])
+        if not ids:
+            break
+        deleted += OutboxJob.objects.filter(id__in=ids).delete()[0]
+
+    # Uploads whose job failed for good are only kept for the same window.
+    live = {
+        payload.get('upload_id') for payload in OutboxJob.objects.filter(kind='upload_image', status__in=['pending', 'running'])
+        .values_list('payload', flat=True)
+    }
+    deleted += OutboxUpload.objects.filter(created_at__lt=cutoff).exclude(id__in=live).delete()[0]
+    return deleted
+
+
+def drain(batch_size=50, executor=None):
+    """Run one claimed batch, on the executor's threads if given; returns the number of jobs claimed."""
+    jobs = claim(batch_size)
+    if executor is None:
+        for job in jobs:
+            run_job(job)
+    else:
+        list(executor.map(run_job, jobs))
+    return len(jobs)
+
+
+# ================= UPLOADS ================= #
+
+def enqueue_image(image_model, parent_field, parent, uploaded_file):
+    # The bytes are staged in the database with the job, so a rolled back
+    # request leaves nothing behind and the worker needs no shared disk; the
+    # Cloudinary upload happens in the worker.
+    upload = OutboxUpload.objects.create(data=b''.join(uploaded_file.chunks()))
+    return enqueue(
+        'upload_image',
+        model=image_model._meta.label,
+        parent_field=parent_field,
+        parent_id=parent.pk,
+        upload_id=upload.pk,
+        name=get_valid_filename(os.path.basename(uploaded_file.name)) or 'image',
+        content_type=getattr(uploaded_file, 'content_type', None),
+    )
+
+
+@handler('upload_image')
+def upload_image(model, parent_field, parent_id, upload_id, name, content_type=None):
+    upload = OutboxUpload.objects.get(pk=upload_id)
+    image_model = apps.get_model(model)
+    parent_model = image_model._meta.get_field(parent_field).related_model
+    if parent_model.objects.filter(pk=parent_id).exists():
+        image_model.objects.create(**{
+            f'{parent_field}_id': parent_id,
+            'image': SimpleUploadedFile(name, bytes(upload.data), content_type=content_type),
+        })
+    upload.delete()
@@ -0,0 +1,45 @@
+import base64
+import json
+from datetime import datetime
+from django.db.models import Q
+
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 50
+
+
+def page_limit(value, default=DEFAULT_PAGE_SIZE, maximum=MAX_PAGE_SIZE):
+    try:
+        limit = int(value)
+    except (TypeError, ValueError):
+        return default
+    return max(1, min(limit, maximum))
+
+
+def encode_cursor(created_at, pk, source=''):
+    payload = json.dumps([created_at.isoformat(), pk, source])
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def decode_cursor(value):
+    if not value:
+        return None
+    try:
+        created_at, pk, source = json.loads(base64.urlsafe_b64decode(value.encode()))
+        return datetime.fromisoformat(created_at), int(pk), str(source)
+    except (ValueError, TypeError, UnicodeError):
+        raise ValueError('Invalid cursor')
+
+
+def keyset_page(queryset, cursor, limit, field='created_at'):
+    # Newest first by (field, id); fetches one extra row to know whether a next page exists.
+    if cursor:
+        moment, pk, _ = cursor
+        queryset = queryset.filter(Q(**{f'{field}__lt': moment}) | Q(**{field: moment, 'id__lt': pk}))
+    page = list(queryset.order_by(f'-{field}', '-id')[:limit + 1])
+
+    next_cursor = None
+    if len(page) > limit:
+        page = page[:limit]
+        next_cursor = encode_cursor(getattr(page[-1], field), page[-1].id)
+    return page, next_cursor
@@ -0,0 +1,43 @@
+from .models import PostIndex
+from .feeds import POST_TYPE_MODELS, post_type_of, author_id_of
+from .geo import encode
+
+
+def index_fields(post):
+    has_location = post.latitude is not None and post.longitude is not None
+    return {
+        'author_id': author_id_of(post),
+        'created_at': post.created_at,
+        'latitude': post.latitude,
+        'longitude': post.longitude,
+        'geohash': encode(float(post.latitude), float(post.longitude)) if has_location else '',
+        'status': getattr(post, 'status', ''),
+    }
+
+
+def sync_post(post):
+    PostIndex.objects.update_or_create(
+        post_type=post_type_of(post),
+        post_id=post.id,
+        defaults=index_fields(post),
+    )
+
+
+def remove_post(post):
+    PostIndex.objects.filter(post_type=post_type_of(post), post_id=post.id).delete()
+
+
+def rebuild(chunk_size=1000):
+    PostIndex.objects.all().delete()
+    count = 0
+    for post_type, model in POST_TYPE_MODELS.items():
+        batch = []
+        for post in model.objects.all().iterator(chunk_size=chunk_size):
+            batch.append(PostIndex(post_type=post_type, post_id=post.id, **index_fields(post)))
+            if len(batch) >= chunk_size:
+                PostIndex.objects.bulk_create(batch)
+                count += len(batch)
+                batch = []
+        PostIndex.objects.bulk_create(batch)
+        count += len(batch)
+    return count
@@ -0,0 +1,112 @@
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+from .models import Follow, PostIndex
+from .feeds import POST_TYPE_MODELS
+from .pagination import encode_cursor
+
+
+POOL_SIZE = getattr(settings, 'FORYOU_POOL_SIZE', 3000)
+POOL_TTL = getattr(settings, 'FORYOU_POOL_TTL', 60)
+POOL_CACHE_KEY = 'foryou:pool'
+# Each pool is also kept under its build time so cursors page through the ordering they started on.
+POOL_SNAPSHOT_TTL = getattr(settings, 'FORYOU_POOL_SNAPSHOT_TTL', 900)
+
+HALF_LIFE_HOURS = 24.0
+VELOCITY_WEIGHT = 0.5
+AFFINITY_BOOST = 1.0
+LIKE_WEIGHT, COMMENT_WEIGHT, SAVE_WEIGHT = 1.0, 2.0, 3.0
+
+POST_TYPES = list(POST_TYPE_MODELS)
+
+
+def build_pool():
+    rows = list(
+        PostIndex.objects.order_by('-created_at')
+        .values_list('post_type', 'post_id', 'author_id', 'created_at')[:POOL_SIZE]
+    )
+    built_at = timezone.now()
+    size = len(rows)
+
+    types = np.fromiter((POST_TYPES.index(row[0]) for row in rows), dtype=np.int8, count=size)
+    ids = np.fromiter((row[1] for row in rows), dtype=np.int64, count=size)
+    authors = np.fromiter((row[2] for row in rows), dtype=np.int64, count=size)
+    age_hours = np.fromiter(((built_at - row[3]).total_seconds() / 3600 for row in rows), dtype=np.float64, count=size)
+
+    engagement = np.zeros(size)
+    for code, post_type in enumerate(POST_TYPES):
+        positions = np.flatnonzero(types == code)
+        if not len(positions):
+            continue
+        counts = {
+            post_id: LIKE_WEIGHT * likes + COMMENT_WEIGHT * comments + SAVE_WEIGHT * saves
+            for post_id, likes, comments, saves in POST_TYPE_MODELS[post_type].objects.filter(
+                id__in=ids[positions].tolist()
+            ).values_list('id', 'like_count', 'comment_count', 'save_count')
+        }
+        engagement[positions] = [counts.get(post_id, 0) for post_id in ids[positions].tolist()]
+
+    age_hours = np.maximum(age_hours, 0)
+    recency = np.power(0.5, age_hours / HALF_LIFE_HOURS)
+    velocity = engagement / (age_hours + 2)
+    base_score = recency + VELOCITY_WEIGHT * np.log1p(velocity)
+
+    return {
+        'built_at': built_at,
+        'types': types,
+        'ids': ids,
+        'authors': authors,
+        'base_score': base_score,
+    }
+
+
+def snapshot_key(built_at):
+    return f"{POOL_CACHE_KEY}:{built_at.timestamp():.6f}"
+
+
+def get_pool():
+    pool = cache.get(POOL_CACHE_KEY)
+    if pool is None:
+        pool = build_pool()
+        cache.set(POOL_CACHE_KEY, pool, POOL_TTL)
+        cache.set(snapshot_key(pool['built_at']), pool, POOL_SNAPSHOT_TTL)
+    return pool
+
+
+def get_pool_snapshot(built_at):
+    pool = get_pool()
+    if pool['built_at'] == built_at:
+        return pool
+    return cache.get(snapshot_key(built_at))
+
+
+def rank_for_user(pool, user):
+    following_ids = np.fromiter(
+        Follow.objects.filter(follower=user).values_list('following_id', flat=True), dtype=np.int64
+    )
+    affinity = 1 + AFFINITY_BOOST * np.isin(pool['authors'], following_ids)
+    return np.argsort(-(pool['base_score'] * affinity), kind='stable')
+
+
+def ranked_page(user, cursor, limit):
+    # Ranked cursors carry (pool build time, offset, 'ranked') and keep reading that pool's
+    # snapshot after a rebuild; once the snapshot has expired the cursor is rejected.
+    offset = 0
+    if cursor:
+        built_at, offset, source = cursor
+        if source != 'ranked' or offset < 0:
+            raise ValueError('Invalid cursor')
+        pool = get_pool_snapshot(built_at)
+        if pool is None:
+            raise ValueError('Cursor expired')
+    else:
+        pool = get_pool()
+
+    order = rank_for_user(pool, user)[offset:offset + limit]
+    refs = [(POST_TYPES[code], post_id) for code, post_id in zip(pool['types'][order].tolist(), pool['ids'][order].tolist())]
+
+    next_cursor = None
+    if offset + limit < len(pool['ids']):
+        next_cursor = encode_cursor(pool['built_at'], offset + limit, 'ranked')
+    return refs, next_cursor
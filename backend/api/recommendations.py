@@ -0,0 +1,154 @@
+import os
+import shutil
+import threading
+import time
+from collections import Counter
+import numpy as np
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from .models import JoinableTripPost, Like, SavedPost
+from .search import analyze
+
+
+VECTORS_FILE = 'trip_vectors.npy'
+IDS_FILE = 'trip_vector_ids.npy'
+# Names the versioned subdirectory holding the live ids/matrix pair.
+CURRENT_FILE = 'CURRENT'
+KEEP_VERSIONS = 2
+MAX_TERMS = 2048
+NUMERIC_WEIGHT = 0.5
+RECOMMENDABLE_STATUSES = ('planning', 'full')
+
+
+def vectors_dir():
+    return getattr(settings, 'RECOMMENDATIONS_DIR', os.path.join(settings.BASE_DIR, 'recommendations'))
+
+
+def _text_matrix(documents):
+    doc_freq = Counter(term for terms in documents for term in set(terms))
+    vocabulary = {term: i for i, (term, _) in enumerate(doc_freq.most_common(MAX_TERMS))}
+    matrix = np.zeros((len(documents), len(vocabulary)), dtype=np.float32)
+    for row, terms in enumerate(documents):
+        for term, count in Counter(terms).items():
+            column = vocabulary.get(term)
+            if column is not None:
+                matrix[row, column] = 1 + np.log(count)
+
+    idf = np.ones(len(vocabulary), dtype=np.float32)
+    for term, column in vocabulary.items():
+        idf[column] = np.log((1 + len(documents)) / (1 + doc_freq[term])) + 1
+    return _normalize(matrix * idf)
+
+
+def _numeric_matrix(trips):
+    budget = np.log1p([trip.budget for trip in trips])
+    duration = np.log1p([max((trip.end_date - trip.start_date).days, 0) for trip in trips])
+    month = 2 * np.pi * (np.array([trip.start_date.month for trip in trips]) - 1) / 12
+    columns = [_standardize(budget), _standardize(duration), np.sin(month), np.cos(month)]
+    return _normalize(np.stack(columns, axis=1).astype(np.float32))
+
+
+def _standardize(values):
+    values = np.asarray(values, dtype=np.float64)
+    spread = values.std()
+    return (values - values.mean()) / spread if spread else np.zeros_like(values)
+
+
+def _normalize(matrix):
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1
+    return matrix / norms
+
+
+def build_vectors():
+    trips = list(JoinableTripPost.objects.order_by('id').only(
+        'id', 'title', 'destination', 'details', 'budget', 'start_date', 'end_date'
+    ))
+    ids = np.array([trip.id for trip in trips], dtype=np.int64)
+    if not trips:
+        return ids, np.zeros((0, 0), dtype=np.float32)
+
+    documents = [analyze(f"{trip.title} {trip.destination} {trip.destination} {trip.details}") for trip in trips]
+    matrix = np.hstack([_text_matrix(documents), NUMERIC_WEIGHT * _numeric_matrix(trips)])
+    return ids, _normalize(matrix).astype(np.float32)
+
+
+def save_vectors(ids, matrix):
+    # Each build gets its own directory; the CURRENT pointer is swapped last,
+    # so readers always load an ids file and the matrix built with it.
+    directory = vectors_dir()
+    version = f"v{time.time_ns()}"
+    os.makedirs(os.path.join(directory, version))
+    for name, array in ((IDS_FILE, ids), (VECTORS_FILE, matrix)):
+        np.save(os.path.join(directory, version, name), array)
+
+    tmp_path = os.path.join(directory, f".{CURRENT_FILE}.tmp")
+    with open(tmp_path, 'w') as f:
+        f.write(version)
+    os.replace(tmp_path, os.path.join(directory, CURRENT_FILE))
+
+    # Older versions may still be memory-mapped by a worker; keep the last few.
+    versions = sorted(name for name in os.listdir(directory) if name.startswith('v'))
+    for name in versions[:-KEEP_VERSIONS]:
+        shutil.rmtree(os.path.join(directory, name), ignore_errors=True)
+
+
+_loaded = None
+_lock = threading.Lock()
+
+
+def load_vectors():
+    global _loaded
+    directory = vectors_dir()
+    try:
+        with open(os.path.join(directory, CURRENT_FILE)) as f:
+            version = f.read().strip()
+    except FileNotFoundError:
+        return None
+    with _lock:
+        if _loaded is None or _loaded['version'] != version:
+            ids = np.load(os.path.join(directory, version, IDS_FILE))
+            _loaded = {
+                'version': version,
+                'ids': ids,
+                'rows': {trip_id: row for row, trip_id in enumerate(ids.tolist())},
+                'matrix': np.load(os.path.join(directory, version, VECTORS_FILE), mmap_mode='r'),
+            }
+        return _loaded
+
+
+def _top_k(vectors, query, k, exclude):
+    if not len(vectors['ids']):
+        return []
+    scores = np.asarray(vectors['matrix'] @ query)
+    for trip_id in exclude:
+        row = vectors['rows'].get(trip_id)
+        if row is not None:
+            scores[row] = -np.inf
+    k = min(k, len(scores))
+    best = np.argpartition(-scores, k - 1)[:k]
+    best = best[np.argsort(-scores[best], kind='stable')]
+    return [int(vectors['ids'][i]) for i in best if np.isfinite(scores[i])]
+
+
+def similar_trip_ids(trip_id, k):
+    vectors = load_vectors()
+    if vectors is None or trip_id not in vectors['rows']:
+        return []
+    return _top_k(vectors, np.asarray(vectors['matrix'][vectors['rows'][trip_id]]), k, [trip_id])
+
+
+def recommended_trip_ids(user, k):
+    vectors = load_vectors()
+    if vectors is None:
+        return []
+    ct = ContentType.objects.get_for_model(JoinableTripPost)
+    liked = set(Like.objects.filter(user=user, content_type=ct).values_list('object_id', flat=True))
+    saved = set(SavedPost.objects.filter(user=user, content_type=ct).values_list('object_id', flat=True))
+    rows = [vectors['rows'][trip_id] for trip_id in liked | saved if trip_id in vectors['rows']]
+    if not rows:
+        return []
+
+    profile = np.asarray(vectors['matrix'][sorted(rows)]).mean(axis=0)
+    own = JoinableTripPost.objects.filter(creator=user).values_list('id', flat=True)
+    return _top_k(vectors, profile, k, liked | saved | set(own))
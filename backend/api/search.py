@@ -0,0 +1,115 @@
+import math
+import re
+from collections import Counter
+from django.db.models import Avg, Count, Q
+from .models import SearchDocument, SearchPosting
+from .feeds import post_type_of
+
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+MAX_TERM_LENGTH = 64
+MIN_PREFIX_LENGTH = 2
+
+STOPWORDS = frozenset({
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'in', 'is',
+    'it', 'of', 'on', 'or', 'the', 'to', 'was', 'with', 'my', 'our', 'we',
+})
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+DOCUMENT_FIELDS = {
+    'experience': ('title',),
+    'general': ('description',),
+    'joinable': ('title', 'destination'),
+}
+
+
+def stem(word):
+    if len(word) <= 3 or word.isdigit():
+        return word
+    if word.endswith('sses'):
+        word = word[:-2]
+    elif word.endswith('ies'):
+        word = word[:-3] + 'y'
+    elif word.endswith('s') and not word.endswith(('ss', 'us', 'is')):
+        word = word[:-1]
+
+    for suffix in ('ing', 'ed'):
+        stemmed = word[:-len(suffix)]
+        if word.endswith(suffix) and len(stemmed) >= 3 and re.search('[aeiouy]', stemmed):
+            word = stemmed
+            if len(word) > 3 and word[-1] == word[-2] and word[-1] not in 'aeiouylsz':
+                word = word[:-1]
+            break
+
+    if len(word) >= 4 and word.endswith('e'):
+        word = word[:-1]
+    return word
+
+
+def tokenize(text):
+    return [token[:MAX_TERM_LENGTH] for token in TOKEN_RE.findall((text or '').lower()) if token not in STOPWORDS]
+
+
+def analyze(text):
+    return [stem(token) for token in tokenize(text)]
+
+
+def index_document(obj):
+    doc_type = post_type_of(obj)
+    terms = analyze(' '.join(str(getattr(obj, field) or '') for field in DOCUMENT_FIELDS[doc_type]))
+    document, _ = SearchDocument.objects.update_or_create(
+        doc_type=doc_type, doc_id=obj.id, defaults={'length': len(terms)}
+    )
+    document.postings.all().delete()
+    SearchPosting.objects.bulk_create([
+        SearchPosting(document=document, doc_type=doc_type, term=term, frequency=frequency)
+        for term, frequency in Counter(terms).items()
+    ])
+
+
+def remove_document(obj):
+    SearchDocument.objects.filter(doc_type=post_type_of(obj), doc_id=obj.id).delete()
+
+
+def search(doc_type, query):
+    # Returns [(doc_id, score)] best BM25 score first; the last token also
+    # matches as a prefix so results keep up with typing.
+    tokens = tokenize(query)
+    if not tokens:
+        return []
+
+    condition = Q(term__in={stem(token) for token in tokens})
+    if len(tokens[-1]) >= MIN_PREFIX_LENGTH:
+        condition |= Q(term__startswith=tokens[-1])
+    postings = list(
+        SearchPosting.objects.filter(condition, doc_type=doc_type)
+        .values_list('document__doc_id', 'document__length', 'term', 'frequency')
+    )
+    if not postings:
+        return []
+
+    stats = SearchDocument.objects.filter(doc_type=doc_type).aggregate(n=Count('id'), avg_length=Avg('length'))
+    total_docs = stats['n']
+    avg_length = stats['avg_length'] or 1
+    doc_freq = Counter(term for _, _, term, _ in postings)
+
+    scores = {}
+    for doc_id, length, term, frequency in postings:
+        df = doc_freq[term]
+        idf = math.log(1 + (total_docs - df + 0.5) / (df + 0.5))
+        norm = frequency + BM25_K1 * (1 - BM25_B + BM25_B * length / avg_length)
+        scores[doc_id] = scores.get(doc_id, 0) + idf * frequency * (BM25_K1 + 1) / norm
+
+    return sorted(scores.items(), key=lambda item: (-item[1], -item[0]))
+
+
+def rebuild(models):
+    SearchDocument.objects.all().delete()
+    count = 0
+    for model in models:
+        for obj in model.objects.all().iterator():
+            index_document(obj)
+            count += 1
+    return count
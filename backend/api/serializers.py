@@ -5,12 +5,33 @@ from .models import (
     JoinableTripPost, JoinableTripImage, TripJoinRequest,
     TripGroup, TripGroupMember, ExperiencePost, ExperienceDay,
     ExperienceDayImage, GeneralPost, GeneralPostImage,
-    Like, Comment, SavedPost, Message, Notification, Follow, Story, StoryView
+    Comment, Message, Notification, Follow, Story, StoryView
 )
+from .notification_targets import NotificationTargets
+from .viewer_state import ViewerState
 
 User = get_user_model()
 
 
+class ViewerStateMixin:
+    def _viewer_state(self, obj):
+        state = self.context.get('viewer_state') or getattr(self, '_own_viewer_state', None)
+        if state is None or not state.covers(obj):
+            request = self.context.get('request')
+            state = ViewerState(request.user if request else None, [obj])
+            self._own_viewer_state = state
+        return state
+
+    def get_is_liked(self, obj):
+        return self._viewer_state(obj).is_liked(obj)
+
+    def get_is_saved(self, obj):
+        return self._viewer_state(obj).is_saved(obj)
+
+    def get_total_likes(self, obj):
+        return obj.like_count
+
+
 class UserSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
@@ -45,7 +66,7 @@ class JoinableTripImageSerializer(serializers.ModelSerializer):
         fields = ['id', 'image']
 
 
-class JoinableTripPostSerializer(serializers.ModelSerializer):
+class JoinableTripPostSerializer(ViewerStateMixin, serializers.ModelSerializer):
     images = JoinableTripImageSerializer(many=True, read_only=True)
     creator = UserSerializer(read_only=True)
     is_liked = serializers.SerializerMethodField()
@@ -60,30 +81,15 @@ class JoinableTripPostSerializer(serializers.ModelSerializer):
             'start_date', 'end_date', 'details', 'min_members',
             'max_members', 'status', 'images', 'created_at',
             'is_liked', 'is_saved', 'total_likes', 'group_id',
-            'latitude', 'longitude'
+            'latitude', 'longitude', 'comment_count', 'save_count'
         ]
+        read_only_fields = ['comment_count', 'save_count']
 
     def get_group_id(self, obj):
-        group = TripGroup.objects.filter(trip=obj).first()
-        return group.id if group else None
-
-    def get_is_liked(self, obj):
-        request = self.context.get('request')
-        if request and request.user.is_authenticated:
-            ct = ContentType.objects.get_for_model(obj)
-            return Like.objects.filter(user=request.user, content_type=ct, object_id=obj.id).exists()
-        return False
-
-    def get_is_saved(self, obj):
-        request = self.context.get('request')
-        if request and request.user.is_authenticated:
-            ct = ContentType.objects.get_for_model(obj)
-            return SavedPost.objects.filter(user=request.user, content_type=ct, object_id=obj.id).exists()
-        return False
-
-    def get_total_likes(self, obj):
-        ct = ContentType.objects.get_for_model(obj)
-        return Like.objects.filter(content_type=ct, object_id=obj.id).count()
+        try:
+            return obj.group.id
+        except TripGroup.DoesNotExist:
+            return None
 
 
 class TripJoinRequestSerializer(serializers.ModelSerializer):
@@ -124,7 +130,7 @@ class ExperienceDaySerializer(serializers.ModelSerializer):
         fields = ['id', 'day_number', 'location_name', 'description', 'date', 'photos']
 
 
-class ExperiencePostSerializer(serializers.ModelSerializer):
+class ExperiencePostSerializer(ViewerStateMixin, serializers.ModelSerializer):
     days = ExperienceDaySerializer(many=True, read_only=True)
     author = UserSerializer(read_only=True)
     is_liked = serializers.SerializerMethodField()
@@ -136,26 +142,9 @@ class ExperiencePostSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'author', 'title', 'cover_image',
             'days', 'created_at', 'is_liked', 'is_saved', 'total_likes',
-            'latitude', 'longitude'
+            'latitude', 'longitude', 'comment_count', 'save_count'
         ]
-
-    def get_is_liked(self, obj):
-        request = self.context.get('request')
-        if request and request.user.is_authenticated:
-            ct = ContentType.objects.get_for_model(obj)
-            return Like.objects.filter(user=request.user, content_type=ct, object_id=obj.id).exists()
-        return False
-
-    def get_is_saved(self, obj):
-        request = self.context.get('request')
-        if request and request.user.is_authenticated:
-            ct = ContentType.objects.get_for_model(obj)
-            return SavedPost.objects.filter(user=request.user, content_type=ct, object_id=obj.id).exists()
-        return False
-
-    def get_total_likes(self, obj):
-        ct = ContentType.objects.get_for_model(obj)
-        return Like.objects.filter(content_type=ct, object_id=obj.id).count()
+        read_only_fields = ['comment_count', 'save_count']
 
 
 class GeneralPostImageSerializer(serializers.ModelSerializer):
@@ -164,7 +153,7 @@ class GeneralPostImageSerializer(serializers.ModelSerializer):
         fields = ['id', 'image']
 
 
-class GeneralPostSerializer(serializers.ModelSerializer):
+class GeneralPostSerializer(ViewerStateMixin, serializers.ModelSerializer):
     images = GeneralPostImageSerializer(many=True, read_only=True)
     author = UserSerializer(read_only=True)
     is_liked = serializers.SerializerMethodField()
@@ -175,26 +164,10 @@ class GeneralPostSerializer(serializers.ModelSerializer):
         model = GeneralPost
         fields = [
             'id', 'author', 'description', 'images', 'created_at',
-            'is_liked', 'is_saved', 'total_likes', 'latitude', 'longitude'
+            'is_liked', 'is_saved', 'total_likes', 'latitude', 'longitude',
+            'comment_count', 'save_count'
         ]
-
-    def get_is_liked(self, obj):
-        request = self.context.get('request')
-        if request and request.user.is_authenticated:
-            ct = ContentType.objects.get_for_model(obj)
-            return Like.objects.filter(user=request.user, content_type=ct, object_id=obj.id).exists()
-        return False
-
-    def get_is_saved(self, obj):
-        request = self.context.get('request')
-        if request and request.user.is_authenticated:
-            ct = ContentType.objects.get_for_model(obj)
-            return SavedPost.objects.filter(user=request.user, content_type=ct, object_id=obj.id).exists()
-        return False
-
-    def get_total_likes(self, obj):
-        ct = ContentType.objects.get_for_model(obj)
-        return Like.objects.filter(content_type=ct, object_id=obj.id).count()
+        read_only_fields = ['comment_count', 'save_count']
 
 
 class CommentSerializer(serializers.ModelSerializer):
@@ -207,6 +180,7 @@ class CommentSerializer(serializers.ModelSerializer):
 
 class MessageSerializer(serializers.ModelSerializer):
     is_mine = serializers.SerializerMethodField()
+    is_read = serializers.SerializerMethodField()
     sender_username = serializers.CharField(source='sender.username', read_only=True)
     sender_profile_pic = serializers.SerializerMethodField()
 
@@ -223,6 +197,10 @@ class MessageSerializer(serializers.ModelSerializer):
             return obj.sender == request.user
         return False
 
+    def get_is_read(self, obj):
+        # Read state lives in the receiver's conversation cursor, passed in by the view.
+        return obj.id <= self.context.get('read_cursors', {}).get(obj.receiver_id, 0)
+
     def get_sender_profile_pic(self, obj):
         if obj.sender.profile_pic:
             request = self.context.get('request')
@@ -237,77 +215,53 @@ class NotificationSerializer(serializers.ModelSerializer):
     post_thumbnail = serializers.SerializerMethodField()
     post_url = serializers.SerializerMethodField()
     comment_text = serializers.SerializerMethodField()
+    recent_actors = serializers.SerializerMethodField()
 
     class Meta:
         model = Notification
         fields = [
             'id', 'sender', 'notification_type', 'text', 'is_read',
-            'created_at', 'object_id', 
-            'post_thumbnail', 'post_url', 'comment_text'
+            'created_at', 'updated_at', 'object_id', 
+            'post_thumbnail', 'post_url', 'comment_text',
+            'actor_count', 'recent_actors'
         ]
 
+    def _targets(self, obj):
+        targets = self.context.get('targets') or getattr(self, '_own_targets', None)
+        if targets is None or not targets.covers(obj):
+            targets = NotificationTargets([obj])
+            self._own_targets = targets
+        return targets
+
+    def get_recent_actors(self, obj):
+        return UserSerializer(self._targets(obj).recent_actors(obj), many=True).data
+
     def get_post_thumbnail(self, obj):
         request = self.context.get('request')
+        image = self._targets(obj).thumbnail(obj)
         try:
-            if obj.notification_type not in ['like', 'comment']:
-                return None
-            if not obj.content_type or not obj.object_id:
-                return None
-            model = obj.content_type.model_class()
-            if model is None:
-                return None
-            post = model.objects.filter(pk=obj.object_id).first()
-            if not post:
-                return None
-            img = getattr(post, 'cover_image', None)
-            if not img and hasattr(post, 'images'):
-                first = post.images.first()
-                img = first.image if first else None
-            if img and request:
-                return request.build_absolute_uri(img.url)
+            if image and request:
+                return request.build_absolute_uri(image.url)
         except Exception:
             pass
         return None
 
     def get_post_url(self, obj):
-        try:
-            if obj.notification_type not in ['like', 'comment']:
-                return None
-            if not obj.content_type or not obj.object_id:
-                return None
-            model_name = obj.content_type.model
-            if model_name == 'experiencepost':
-                return f'/trip/{obj.object_id}'
-            elif model_name == 'generalpost':
-                return f'/general-post/{obj.object_id}'
-            elif model_name == 'joinabletrippost':
-                return f'/joinable-trip/{obj.object_id}'
-        except Exception:
-            pass
+        if obj.notification_type not in ['like', 'comment']:
+            return None
+        if not obj.content_type_id or not obj.object_id:
+            return None
+        model_name = ContentType.objects.get_for_id(obj.content_type_id).model
+        if model_name == 'experiencepost':
+            return f'/trip/{obj.object_id}'
+        elif model_name == 'generalpost':
+            return f'/general-post/{obj.object_id}'
+        elif model_name == 'joinabletrippost':
+            return f'/joinable-trip/{obj.object_id}'
         return None
 
     def get_comment_text(self, obj):
-        try:
-            if obj.notification_type != 'comment':
-                return None
-            if not obj.content_type or not obj.object_id:
-                return None
-            model = obj.content_type.model_class()
-            if model is None:
-                return None
-            post = model.objects.filter(pk=obj.object_id).first()
-            if not post:
-                return None
-            post_ct = ContentType.objects.get_for_model(post)
-            comment = Comment.objects.filter(
-                content_type=post_ct,
-                object_id=post.id,
-                user=obj.sender
-            ).order_by('-created_at').first()
-            return comment.text if comment else None
-        except Exception:
-            pass
-        return None
+        return self._targets(obj).comment_text(obj)
 
 
 class StorySerializer(serializers.ModelSerializer):
@@ -1,22 +1,32 @@
-from django.db.models.signals import post_save
+from django.db.models import Max
+from django.db.models.signals import pre_save, post_save, post_delete
 from django.dispatch import receiver
 from django.contrib.contenttypes.models import ContentType
-from .models import TripJoinRequest, Notification, TripGroup, TripGroupMember
+from .models import (
+    TripJoinRequest, Notification, TripGroup, TripGroupMember,
+    ExperiencePost, GeneralPost, JoinableTripPost, Follow,
+    Like, Comment, SavedPost, User, Message
+)
+from . import chat, conversations, notifications, timeline, post_index, feed_cache, search, autocomplete, clusters, trip_intervals
+from .feeds import author_id_of, post_type_of
+from .counters import adjust_counter
 
 
+# Notifications and group memberships are written in the request's own process
+# so their post-commit pushes reach sockets over the web process's channel layer.
 @receiver(post_save, sender=TripJoinRequest)
 def notify_trip_owner_on_request(sender, instance, created, **kwargs):
     if created:
         trip = instance.trip
-        owner = trip.creator
         sender_user = instance.user
 
-        Notification.objects.create(
+        Notification.objects.get_or_create(
             sender=sender_user,
-            receiver=owner,
+            receiver=trip.creator,
             notification_type='join_request',
             content_type=ContentType.objects.get_for_model(instance),
-            object_id=instance.id
+            object_id=instance.id,
+            defaults={'text': f"{sender_user.username} is interested in joining your trip '{trip.title}'"}
         )
 
 
@@ -24,7 +34,6 @@ def notify_trip_owner_on_request(sender, instance, created, **kwargs):
 def handle_request_acceptance(sender, instance, created, **kwargs):
     if not created and instance.status == 'accepted':
         trip = instance.trip
-        user = instance.user
 
         group, _ = TripGroup.objects.get_or_create(
             trip=trip,
@@ -33,14 +42,164 @@ def handle_request_acceptance(sender, instance, created, **kwargs):
 
         TripGroupMember.objects.get_or_create(
             group=group,
-            user=user,
+            user=instance.user,
             defaults={'role': 'member'}
         )
 
-        Notification.objects.create(
+        Notification.objects.get_or_create(
             sender=trip.creator,
-            receiver=user,
+            receiver=instance.user,
             notification_type='request_accepted',
             content_type=ContentType.objects.get_for_model(instance),
-            object_id=instance.id
-        )
\ No newline at end of file
+            object_id=instance.id,
+            defaults={'text': f"{trip.creator.username} accepted your request to join the trip '{trip.title}'"}
+        )
+
+
+@receiver(post_save, sender=ExperiencePost)
+@receiver(post_save, sender=GeneralPost)
+@receiver(post_save, sender=JoinableTripPost)
+def fan_out_new_post(sender, instance, created, **kwargs):
+    if created:
+        timeline.fan_out_post(instance)
+
+
+@receiver(post_delete, sender=ExperiencePost)
+@receiver(post_delete, sender=GeneralPost)
+@receiver(post_delete, sender=JoinableTripPost)
+def remove_deleted_post(sender, instance, **kwargs):
+    timeline.remove_post(instance)
+
+
+@receiver(post_save, sender=ExperiencePost)
+@receiver(post_save, sender=GeneralPost)
+@receiver(post_save, sender=JoinableTripPost)
+def index_saved_post(sender, instance, **kwargs):
+    post_index.sync_post(instance)
+    clusters.post_saved(instance)
+
+
+@receiver(post_delete, sender=ExperiencePost)
+@receiver(post_delete, sender=GeneralPost)
+@receiver(post_delete, sender=JoinableTripPost)
+def unindex_deleted_post(sender, instance, **kwargs):
+    post_index.remove_post(instance)
+    clusters.post_deleted(instance)
+
+
+@receiver(post_save, sender=Follow)
+def backfill_timeline_on_follow(sender, instance, created, **kwargs):
+    if created:
+        timeline.backfill_follow(instance.follower_id, instance.following_id)
+
+
+@receiver(post_delete, sender=Follow)
+def prune_timeline_on_unfollow(sender, instance, **kwargs):
+    timeline.prune_follow(instance.follower_id, instance.following_id)
+
+
+@receiver(post_save, sender=Like)
+@receiver(post_save, sender=Comment)
+@receiver(post_save, sender=SavedPost)
+def increment_post_counter(sender, instance, created, **kwargs):
+    if created:
+        adjust_counter(instance, 1)
+
+
+@receiver(post_delete, sender=Like)
+@receiver(post_delete, sender=Comment)
+@receiver(post_delete, sender=SavedPost)
+def decrement_post_counter(sender, instance, **kwargs):
+    adjust_counter(instance, -1)
+
+
+@receiver(post_save, sender=ExperiencePost)
+@receiver(post_save, sender=GeneralPost)
+@receiver(post_save, sender=JoinableTripPost)
+@receiver(post_delete, sender=ExperiencePost)
+@receiver(post_delete, sender=GeneralPost)
+@receiver(post_delete, sender=JoinableTripPost)
+def invalidate_author_feeds(sender, instance, **kwargs):
+    feed_cache.touch_authors([author_id_of(instance)])
+
+
+@receiver(post_save, sender=Like)
+@receiver(post_save, sender=SavedPost)
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Like)
+@receiver(post_delete, sender=SavedPost)
+@receiver(post_delete, sender=Comment)
+def invalidate_engagement_feeds(sender, instance, **kwargs):
+    feed_cache.touch_viewer(instance.user_id)
+    feed_cache.touch_target_author(instance)
+
+
+@receiver(post_save, sender=Follow)
+@receiver(post_delete, sender=Follow)
+def invalidate_follower_feeds(sender, instance, **kwargs):
+    feed_cache.touch_viewer(instance.follower_id)
+
+
+@receiver(post_save, sender=ExperiencePost)
+@receiver(post_save, sender=GeneralPost)
+@receiver(post_save, sender=JoinableTripPost)
+def update_search_index(sender, instance, update_fields=None, **kwargs):
+    if update_fields and not set(update_fields) & set(search.DOCUMENT_FIELDS[post_type_of(instance)]):
+        return
+    search.index_document(instance)
+
+
+@receiver(post_delete, sender=ExperiencePost)
+@receiver(post_delete, sender=GeneralPost)
+@receiver(post_delete, sender=JoinableTripPost)
+def remove_from_search_index(sender, instance, **kwargs):
+    search.remove_document(instance)
+
+
+@receiver(post_save, sender=User)
+def update_autocomplete(sender, instance, update_fields=None, **kwargs):
+    if update_fields and not set(update_fields) & set(autocomplete.INDEXED_FIELDS):
+        return
+    autocomplete.update_user(instance)
+
+
+@receiver(post_delete, sender=User)
+def remove_from_autocomplete(sender, instance, **kwargs):
+    autocomplete.remove_user(instance)
+
+
+@receiver(post_save, sender=JoinableTripPost)
+@receiver(post_delete, sender=JoinableTripPost)
+def refresh_trip_intervals(sender, instance, **kwargs):
+    trip_intervals.mark_stale()
+
+
+@receiver(post_save, sender=Message)
+def update_conversation(sender, instance, created, **kwargs):
+    if created and instance.receiver_id:
+        conversations.record_message(instance)
+
+
+@receiver(pre_save, sender=TripGroupMember)
+def start_member_read_cursor(sender, instance, **kwargs):
+    # New members start caught up rather than with the group's whole history unread.
+    if instance._state.adding and not instance.last_read_message_id:
+        latest = Message.objects.filter(group_id=instance.group_id).aggregate(last_id=Max('id'))['last_id']
+        instance.last_read_message_id = latest or 0
+
+
+@receiver(post_save, sender=TripGroupMember)
+def subscribe_group_member(sender, instance, created, **kwargs):
+    if created:
+        chat.subscribe_member(instance.user_id, instance.group_id)
+
+
+@receiver(post_delete, sender=TripGroupMember)
+def unsubscribe_group_member(sender, instance, **kwargs):
+    chat.unsubscribe_member(instance.user_id, instance.group_id)
+
+
+@receiver(post_save, sender=Notification)
+def dispatch_notification(sender, instance, **kwargs):
+    # Aggregated notifications are re-pushed each time another actor is folded in.
+    notifications.dispatch(instance)
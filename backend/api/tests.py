@@ -1,3 +1,329 @@
-from django.test import TestCase
+import random
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from datetime import datetime, timedelta
+from unittest import mock
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import SimpleTestCase, TestCase, TransactionTestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+from .models import (
+    User, Follow, GeneralPost, JoinableTripPost, PostIndex, Message,
+    GeneralPostImage, TripGroup, TripGroupMember, TripJoinRequest, OutboxJob, OutboxUpload
+)
+from .pagination import decode_cursor, keyset_page
+from .trip_intervals import IntervalTree
+from . import chat, conversations, feed_cache, outbox, ranking, timeline, trip_intervals
 
-# Create your tests here.
+
+class APITestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.alice = User.objects.create_user('alice', 'alice@example.com', 'pw')
+        self.bob = User.objects.create_user('bob', 'bob@example.com', 'pw')
+        self.client = APIClient()
+        self.client.force_authenticate(self.alice)
+
+    def make_trip(self, start, end, status='planning'):
+        return JoinableTripPost.objects.create(
+            creator=self.bob, title='Goa trip', destination='Goa', budget=1000,
+            start_date=start, end_date=end, max_members=4, status=status
+        )
+
+
+class TimelineTests(APITestCase):
+    def test_new_posts_fan_out_to_followers(self):
+        Follow.objects.create(follower=self.alice, following=self.bob)
+        post = GeneralPost.objects.create(author=self.bob, description='hello')
+        self.assertEqual(timeline.read_timeline(self.alice, 10), [('general', post.id)])
+        self.assertEqual(timeline.read_timeline(self.bob, 10), [])
+
+    def test_follow_backfills_and_unfollow_prunes(self):
+        posts = [GeneralPost.objects.create(author=self.bob, description=f'post {i}') for i in range(3)]
+        follow = Follow.objects.create(follower=self.alice, following=self.bob)
+        self.assertEqual(timeline.read_timeline(self.alice, 10), [('general', post.id) for post in reversed(posts)])
+
+        follow.delete()
+        self.assertEqual(timeline.read_timeline(self.alice, 10), [])
+
+    def test_author_crossing_the_threshold_is_not_repeated(self):
+        carol = User.objects.create_user('carol', 'carol@example.com', 'pw')
+        with mock.patch.object(timeline, 'FANOUT_MAX_FOLLOWERS', 1):
+            Follow.objects.create(follower=self.alice, following=self.bob)
+            post = GeneralPost.objects.create(author=self.bob, description='hello')
+            Follow.objects.create(follower=carol, following=self.bob)
+            newer = GeneralPost.objects.create(author=self.bob, description='again')
+
+            data = self.client.get('/api/posts/following/').json()
+        self.assertEqual([item['id'] for item in data], [newer.id, post.id])
+
+
+class CursorPaginationTests(APITestCase):
+    def test_keyset_page_walks_ties_without_gaps_or_repeats(self):
+        for _ in range(5):
+            GeneralPost.objects.create(author=self.bob, description='hello')
+        PostIndex.objects.update(created_at=timezone.now())
+
+        seen, cursor = [], None
+        while True:
+            page, next_cursor = keyset_page(PostIndex.objects.all(), decode_cursor(cursor), 2)
+            seen.extend(entry.id for entry in page)
+            if next_cursor is None:
+                break
+            cursor = next_cursor
+        self.assertEqual(sorted(seen), sorted(PostIndex.objects.values_list('id', flat=True)))
+        self.assertEqual(len(seen), len(set(seen)))
+
+    def test_recent_feed_pages_through_every_post(self):
+        posts = [GeneralPost.objects.create(author=self.bob, description=f'post {i}') for i in range(5)]
+        ids, url = [], '/api/posts/foryou/?order=recent&limit=2'
+        while url:
+            data = self.client.get(url).json()
+            ids.extend(post['id'] for post in data['results'])
+            url = f"/api/posts/foryou/?order=recent&limit=2&cursor={data['next_cursor']}" if data['next_cursor'] else None
+        self.assertEqual(ids, [post.id for post in reversed(posts)])
+
+    def test_ranked_cursor_keeps_its_pool_after_a_rebuild(self):
+        for i in range(5):
+            GeneralPost.objects.create(author=self.bob, description=f'post {i}')
+        first = self.client.get('/api/posts/foryou/?limit=2').json()
+
+        cache.delete(ranking.POOL_CACHE_KEY)
+        for i in range(3):
+            GeneralPost.objects.create(author=self.alice, description=f'newer {i}')
+        rest = self.client.get(f"/api/posts/foryou/?limit=10&cursor={first['next_cursor']}").json()
+
+        ids = [post['id'] for post in first['results'] + rest['results']]
+        self.assertEqual(len(ids), 5)
+        self.assertEqual(len(set(ids)), 5)
+
+    def test_expired_or_malformed_cursor_is_rejected(self):
+        GeneralPost.objects.create(author=self.bob, description='one')
+        GeneralPost.objects.create(author=self.bob, description='two')
+        cursor = self.client.get('/api/posts/foryou/?limit=1').json()['next_cursor']
+        cache.clear()
+        self.assertEqual(self.client.get(f'/api/posts/foryou/?cursor={cursor}').status_code, 400)
+        self.assertEqual(self.client.get('/api/posts/foryou/?cursor=junk').status_code, 400)
+
+
+class FeedCacheTests(APITestCase):
+    def test_write_committed_during_computation_is_not_cached_over(self):
+        cached, started = feed_cache.get_response(self.alice.id, 'following', {})
+        self.assertIsNone(cached)
+        with self.captureOnCommitCallbacks(execute=True):
+            feed_cache.touch_authors([self.bob.id])
+        feed_cache.set_response(self.alice.id, 'following', {}, ['stale'], [self.bob.id], started)
+        self.assertIsNone(feed_cache.get_response(self.alice.id, 'following', {})[0])
+
+        cached, started = feed_cache.get_response(self.alice.id, 'following', {})
+        feed_cache.set_response(self.alice.id, 'following', {}, ['fresh'], [self.bob.id], started)
+        self.assertEqual(feed_cache.get_response(self.alice.id, 'following', {})[0], ['fresh'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            feed_cache.touch_authors([self.bob.id])
+        self.assertIsNone(feed_cache.get_response(self.alice.id, 'following', {})[0])
+
+
+class IntervalTreeTests(SimpleTestCase):
+    def test_matches_brute_force(self):
+        rng = random.Random(3)
+        intervals = []
+        for trip_id in range(1000):
+            start = rng.uniform(0, 1000)
+            intervals.append((start, start + rng.uniform(0, 50), trip_id))
+        tree = IntervalTree(intervals)
+        for _ in range(200):
+            start = rng.uniform(-10, 1010)
+            end = start + rng.uniform(0, 30)
+            expected = sorted(trip_id for a, b, trip_id in intervals if a <= end and b >= start)
+            self.assertEqual(sorted(tree.overlapping(start, end)), expected)
+
+    def test_touching_endpoints_overlap(self):
+        tree = IntervalTree([(0, 10, 1), (10, 20, 2), (21, 30, 3)])
+        self.assertEqual(sorted(tree.overlapping(10, 10)), [1, 2])
+        self.assertEqual(IntervalTree([]).overlapping(0, 1), [])
+
+
+class MatchingTripsTests(APITestCase):
+    def test_only_open_trips_overlapping_the_range(self):
+        day = timezone.make_aware(datetime(2026, 5, 1))
+        with self.captureOnCommitCallbacks(execute=True):
+            first = self.make_trip(day, day + timedelta(days=9))
+            second = self.make_trip(day + timedelta(days=7), day + timedelta(days=19), status='full')
+            self.make_trip(day + timedelta(days=8), day + timedelta(days=11), status='completed')
+
+        data = self.client.get('/api/joinable-trips/matching/?start=2026-05-10&end=2026-05-10').json()
+        self.assertEqual([trip['id'] for trip in data['results']], [first.id, second.id])
+        self.assertEqual(self.client.get('/api/joinable-trips/matching/').status_code, 400)
+
+    def test_tree_goes_stale_only_after_commit(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.make_trip(timezone.now(), timezone.now() + timedelta(days=3))
+            self.assertIsNone(cache.get(trip_intervals.GENERATION_KEY))
+        for callback in callbacks:
+            callback()
+        self.assertIsNotNone(cache.get(trip_intervals.GENERATION_KEY))
+
+
+class ReadCursorTests(APITestCase):
+    def unread_messages(self):
+        return self.client.get('/api/counts/').json()['messages']
+
+    def test_direct_read_cursor(self):
+        for i in range(3):
+            chat.send_direct_message(self.bob, self.alice, f'hi {i}')
+        self.assertEqual(self.unread_messages(), 3)
+
+        self.client.get(f'/api/messages/chat/{self.bob.id}/')
+        self.assertEqual(self.unread_messages(), 0)
+
+        chat.send_direct_message(self.bob, self.alice, 'again')
+        self.assertEqual(self.unread_messages(), 1)
+
+    def test_new_group_member_starts_caught_up(self):
+        trip = self.make_trip(timezone.now(), timezone.now() + timedelta(days=3))
+        group = TripGroup.objects.create(trip=trip, name='Goa trip Group')
+        TripGroupMember.objects.create(group=group, user=self.bob, role='admin')
+        for i in range(3):
+            chat.send_group_message(self.bob, group, f'plan {i}')
+
+        membership = TripGroupMember.objects.create(group=group, user=self.alice)
+        self.assertEqual(membership.last_read_message_id, Message.objects.latest('id').id)
+        self.assertEqual(self.unread_messages(), 0)
+
+        chat.send_group_message(self.bob, group, 'welcome')
+        self.assertEqual(self.unread_messages(), 1)
+        self.client.get(f'/api/groups/{group.id}/chat/')
+        self.assertEqual(self.unread_messages(), 0)
+
+
+class ReadCursorMigrationTests(TransactionTestCase):
+    before = [('api', '0016_message_api_message_sender__c8a439_idx_and_more')]
+    after = [('api', '0018_read_cursors')]
+
+    def migrate(self, targets):
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate(targets)
+        return executor.loader.project_state(targets).apps
+
+    def tearDown(self):
+        self.migrate(MigrationExecutor(connection).loader.graph.leaf_nodes())
+
+    def test_is_read_flags_become_cursors(self):
+        apps = self.migrate(self.before)
+        old_user = apps.get_model('api', 'User')
+        old_message = apps.get_model('api', 'Message')
+        alice, bob = (old_user.objects.create(username=name, email=f'{name}@example.com') for name in ('alice', 'bob'))
+        for sender, receiver, is_read in [
+            (alice, bob, True), (bob, alice, True), (alice, bob, True),
+            (alice, bob, False), (bob, alice, False), (alice, alice, False),
+        ]:
+            old_message.objects.create(sender=sender, receiver=receiver, content='hi', is_read=is_read)
+
+        self.migrate(self.after)
+        self.assertEqual(conversations.unread_total(User.objects.get(username='alice')), 1)
+        self.assertEqual(conversations.unread_total(User.objects.get(username='bob')), 1)
+
+
+class TripGroupJoinTests(APITestCase):
+    def test_approval_joins_the_group_and_subscribes_open_sockets(self):
+        layer = get_channel_layer()
+        channel = async_to_sync(layer.new_channel)()
+        async_to_sync(layer.group_add)(chat.chat_group(self.alice.id), channel)
+        trip = self.make_trip(timezone.now(), timezone.now() + timedelta(days=3))
+        join_request = TripJoinRequest.objects.create(user=self.alice, trip=trip)
+
+        self.client.force_authenticate(self.bob)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(f'/api/joinable-trips/requests/{join_request.id}/approve/')
+
+        group = TripGroup.objects.get(trip=trip)
+        self.assertTrue(TripGroupMember.objects.filter(group=group, user=self.alice).exists())
+        self.assertFalse(OutboxJob.objects.exists())
+        event = async_to_sync(layer.receive)(channel)
+        self.assertEqual((event['type'], event['group']), ('chat.subscribe', group.id))
+
+
+class OutboxTests(TestCase):
+    def register(self, kind, func):
+        outbox.handler(kind)(func)
+        self.addCleanup(outbox.HANDLERS.pop, kind, None)
+
+    def test_success_marks_done(self):
+        ran = []
+        self.register('test_ok', lambda value: ran.append(value))
+        job = outbox.enqueue('test_ok', value=7)
+        self.assertEqual(outbox.drain(), 1)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts, ran), ('done', 1, [7]))
+
+    def test_failures_back_off_then_fail(self):
+        calls = []
+
+        def fail():
+            calls.append(1)
+            raise ValueError('boom')
+        self.register('test_fail', fail)
+        job = outbox.enqueue('test_fail')
+
+        outbox.drain()
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), ('pending', 1))
+        self.assertGreater(job.available_at, timezone.now())
+        self.assertIn('ValueError: boom', job.last_error)
+        self.assertEqual(outbox.drain(), 0)
+
+        for _ in range(outbox.MAX_ATTEMPTS):
+            OutboxJob.objects.filter(pk=job.pk).update(available_at=timezone.now())
+            outbox.drain()
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts, len(calls)), ('failed', outbox.MAX_ATTEMPTS, outbox.MAX_ATTEMPTS))
+
+    def test_expired_lease_is_reclaimed_and_run_once(self):
+        ran = []
+        self.register('test_lease', lambda: ran.append(1))
+        job = outbox.enqueue('test_lease')
+
+        [first] = outbox.claim(10)
+        self.assertEqual(outbox.claim(10), [])
+        OutboxJob.objects.filter(pk=job.pk).update(locked_at=timezone.now() - outbox.LEASE - timedelta(seconds=1))
+        [second] = outbox.claim(10)
+        self.assertEqual(second.attempts, 2)
+
+        self.assertFalse(outbox.run_job(first))
+        self.assertTrue(outbox.run_job(second))
+        self.assertEqual(ran, [1])
+
+    def test_prune_deletes_old_done_jobs(self):
+        old = timezone.now() - outbox.RETENTION - timedelta(hours=1)
+        done = outbox.enqueue('test_done')
+        pending = outbox.enqueue('test_pending')
+        OutboxJob.objects.filter(pk=done.pk).update(status='done', available_at=old)
+        OutboxJob.objects.filter(pk=pending.pk).update(available_at=old)
+
+        self.assertEqual(outbox.prune(), 1)
+        self.assertEqual(list(OutboxJob.objects.values_list('id', flat=True)), [pending.id])
+
+    def test_uploads_are_staged_in_the_database(self):
+        author = User.objects.create_user('carol', 'carol@example.com', 'pw')
+        post = GeneralPost.objects.create(author=author, description='beach')
+        job = outbox.enqueue_image(GeneralPostImage, 'post', post, SimpleUploadedFile('a b.jpg', b'jpeg bytes'))
+        upload = OutboxUpload.objects.get(pk=job.payload['upload_id'])
+        self.assertEqual((bytes(upload.data), job.payload['name']), (b'jpeg bytes', 'a_b.jpg'))
+
+        old = timezone.now() - outbox.RETENTION - timedelta(hours=1)
+        orphan = OutboxUpload.objects.create(data=b'lost')
+        OutboxUpload.objects.update(created_at=old)
+        outbox.prune()
+        self.assertEqual(list(OutboxUpload.objects.values_list('id', flat=True)), [upload.id])
+        self.assertFalse(OutboxUpload.objects.filter(pk=orphan.pk).exists())
+
+        post.delete()
+        self.assertEqual(outbox.drain(), 1)
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'done')
+        self.assertFalse(OutboxUpload.objects.exists())
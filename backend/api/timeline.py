@@ -0,0 +1,105 @@
+from django.conf import settings
+from django.db.models import Count, OuterRef, Subquery
+from .models import Follow, TimelineEntry, PostIndex
+from .feeds import post_type_of, author_id_of
+
+
+# Authors above this many followers are not fanned out on write; their posts
+# are merged into followers' timelines at read time instead.
+FANOUT_MAX_FOLLOWERS = getattr(settings, 'TIMELINE_FANOUT_MAX_FOLLOWERS', 5000)
+BACKFILL_POSTS = getattr(settings, 'TIMELINE_BACKFILL_POSTS', 60)
+
+
+def is_high_follower(author_id):
+    return Follow.objects.filter(following_id=author_id).count() > FANOUT_MAX_FOLLOWERS
+
+
+def high_follower_followings(user):
+    follower_counts = Follow.objects.filter(
+        following=OuterRef('following_id')
+    ).order_by().values('following').annotate(n=Count('id')).values('n')
+    return list(
+        Follow.objects.filter(follower=user)
+        .annotate(n=Subquery(follower_counts))
+        .filter(n__gt=FANOUT_MAX_FOLLOWERS)
+        .values_list('following_id', flat=True)
+    )
+
+
+def fan_out_post(post):
+    author_id = author_id_of(post)
+    if is_high_follower(author_id):
+        return
+
+    post_type = post_type_of(post)
+    follower_ids = Follow.objects.filter(following_id=author_id).values_list('follower_id', flat=True)
+    TimelineEntry.objects.bulk_create(
+        [
+            TimelineEntry(
+                user_id=follower_id,
+                author_id=author_id,
+                post_type=post_type,
+                post_id=post.id,
+                created_at=post.created_at,
+            )
+            for follower_id in follower_ids.iterator()
+        ],
+        batch_size=1000,
+        ignore_conflicts=True,
+    )
+
+
+def remove_post(post):
+    TimelineEntry.objects.filter(post_type=post_type_of(post), post_id=post.id).delete()
+
+
+def backfill_follow(follower_id, author_id):
+    if is_high_follower(author_id):
+        return
+
+    recent = (
+        PostIndex.objects.filter(author_id=author_id)
+        .order_by('-created_at')
+        .values_list('post_type', 'post_id', 'created_at')[:BACKFILL_POSTS]
+    )
+    TimelineEntry.objects.bulk_create(
+        [
+            TimelineEntry(
+                user_id=follower_id,
+                author_id=author_id,
+                post_type=post_type,
+                post_id=post_id,
+                created_at=created_at,
+            )
+            for post_type, post_id, created_at in recent
+        ],
+        ignore_conflicts=True,
+    )
+
+
+def prune_follow(follower_id, author_id):
+    TimelineEntry.objects.filter(user_id=follower_id, author_id=author_id).delete()
+
+
+def read_timeline(user, limit):
+    # Authors who crossed the threshold after being fanned out still have rows
+    # in their followers' timelines; their posts come from PostIndex only.
+    high_follower_ids = high_follower_followings(user)
+    entries = list(
+        TimelineEntry.objects.filter(user=user)
+        .exclude(author_id__in=high_follower_ids)
+        .order_by('-created_at', '-id')
+        .values_list('post_type', 'post_id', 'created_at')[:limit]
+    )
+
+    if high_follower_ids:
+        recent = (
+            PostIndex.objects.filter(author_id__in=high_follower_ids)
+            .order_by('-created_at')
+            .values_list('post_type', 'post_id', 'created_at')[:limit]
+        )
+        entries.extend(recent)
+        entries.sort(key=lambda e: e[2], reverse=True)
+        entries = entries[:limit]
+
+    return [(post_type, post_id) for post_type, post_id, _ in entries]
@@ -0,0 +1,110 @@
+from datetime import datetime, time
+from django.db.models import Count, F, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from .models import JoinableTripPost, TripGroupMember
+
+
+BUDGET_BUCKETS = [(0, 10000), (10000, 25000), (25000, 50000), (50000, 100000), (100000, None)]
+STATUSES = [value for value, _ in JoinableTripPost.STATUS_CHOICES]
+
+
+def parse_moment(value, end_of_day=False):
+    moment = parse_datetime(value)
+    if moment is None:
+        day = parse_date(value)
+        if day is None:
+            raise ValueError(f"Invalid date: {value}")
+        moment = datetime.combine(day, time.max if end_of_day else time.min)
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment
+
+
+def parse_filters(params):
+    filters = {}
+    if params.get('start'):
+        filters['start'] = parse_moment(params['start'])
+    if params.get('end'):
+        filters['end'] = parse_moment(params['end'], end_of_day=True)
+    for name in ('budget_min', 'budget_max', 'min_seats'):
+        if params.get(name):
+            try:
+                filters[name] = int(params[name])
+            except ValueError:
+                raise ValueError(f"Invalid {name}: {params[name]}")
+    if params.get('status'):
+        filters['status'] = [value for value in params['status'].split(',') if value in STATUSES]
+    if params.get('destination'):
+        filters['destination'] = params['destination'].strip()
+    return filters
+
+
+def _status_q(filters):
+    return Q(status__in=filters['status']) if 'status' in filters else Q()
+
+
+def _budget_q(filters):
+    condition = Q()
+    if 'budget_min' in filters:
+        condition &= Q(budget__gte=filters['budget_min'])
+    if 'budget_max' in filters:
+        condition &= Q(budget__lte=filters['budget_max'])
+    return condition
+
+
+def _bucket_q(low, high):
+    condition = Q(budget__gte=low)
+    if high is not None:
+        condition &= Q(budget__lt=high)
+    return condition
+
+
+def base_queryset(queryset, filters):
+    # Every filter except status and budget, which facets count across.
+    if 'end' in filters:
+        queryset = queryset.filter(start_date__lte=filters['end'])
+    if 'start' in filters:
+        queryset = queryset.filter(end_date__gte=filters['start'])
+    if 'destination' in filters:
+        queryset = queryset.filter(destination__icontains=filters['destination'])
+    if 'min_seats' in filters:
+        members = (
+            TripGroupMember.objects.filter(group__trip=OuterRef('pk'))
+            .order_by().values('group').annotate(n=Count('id')).values('n')
+        )
+        queryset = queryset.annotate(member_count=Coalesce(Subquery(members), 0)).filter(
+            max_members__gte=F('member_count') + filters['min_seats']
+        )
+    return queryset
+
+
+def apply_filters(queryset, filters):
+    return base_queryset(queryset, filters).filter(_status_q(filters) & _budget_q(filters))
+
+
+def _count(condition):
+    return Count('id', filter=condition) if condition else Count('id')
+
+
+def facet_counts(filters):
+    # Status counts ignore the status filter and budget counts ignore the budget
+    # filter, so clients can show alternatives; all in one aggregate query.
+    status_q = _status_q(filters)
+    budget_q = _budget_q(filters)
+    aggregates = {'total': _count(status_q & budget_q)}
+    for value in STATUSES:
+        aggregates[f"status_{value}"] = _count(budget_q & Q(status=value))
+    for i, (low, high) in enumerate(BUDGET_BUCKETS):
+        aggregates[f"budget_{i}"] = _count(status_q & _bucket_q(low, high))
+
+    counts = base_queryset(JoinableTripPost.objects.all(), filters).aggregate(**aggregates)
+    return {
+        'total': counts['total'],
+        'status': {value: counts[f"status_{value}"] for value in STATUSES},
+        'budget': [
+            {'min': low, 'max': high, 'count': counts[f"budget_{i}"]}
+            for i, (low, high) in enumerate(BUDGET_BUCKETS)
+        ],
+    }
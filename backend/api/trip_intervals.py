@@ -0,0 +1,98 @@
+import threading
+import time
+from django.core.cache import cache
+from django.db import transaction
+from .models import JoinableTripPost
+
+
+# Centered interval tree over open trips, rebuilt per worker when a trip
+# changes anywhere (shared generation in the cache).
+ACTIVE_STATUSES = ('planning', 'full')
+GENERATION_KEY = 'trip_intervals:generation'
+
+
+class _Node:
+    __slots__ = ('center', 'by_start', 'by_end', 'left', 'right')
+
+
+def _build(intervals):
+    if not intervals:
+        return None
+    endpoints = sorted(point for start, end, _ in intervals for point in (start, end))
+    node = _Node()
+    node.center = endpoints[len(endpoints) // 2]
+    left, right, here = [], [], []
+    for interval in intervals:
+        if interval[1] < node.center:
+            left.append(interval)
+        elif interval[0] > node.center:
+            right.append(interval)
+        else:
+            here.append(interval)
+    node.by_start = sorted(here, key=lambda interval: interval[0])
+    node.by_end = sorted(here, key=lambda interval: interval[1], reverse=True)
+    node.left = _build(left)
+    node.right = _build(right)
+    return node
+
+
+class IntervalTree:
+    def __init__(self, intervals):
+        self.size = len(intervals)
+        self.root = _build(list(intervals))
+
+    def overlapping(self, start, end):
+        # ids of intervals with interval.start <= end and interval.end >= start
+        found = []
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            if node is None:
+                continue
+            if end < node.center:
+                for interval in node.by_start:
+                    if interval[0] > end:
+                        break
+                    found.append(interval[2])
+                stack.append(node.left)
+            elif start > node.center:
+                for interval in node.by_end:
+                    if interval[1] < start:
+                        break
+                    found.append(interval[2])
+                stack.append(node.right)
+            else:
+                found.extend(interval[2] for interval in node.by_start)
+                stack.append(node.left)
+                stack.append(node.right)
+        return found
+
+
+_tree = None
+_generation = None
+_lock = threading.Lock()
+
+
+def build():
+    rows = JoinableTripPost.objects.filter(status__in=ACTIVE_STATUSES).values_list('start_date', 'end_date', 'id')
+    return IntervalTree([(start.timestamp(), end.timestamp(), trip_id) for start, end, trip_id in rows.iterator()])
+
+
+def get_tree():
+    global _tree, _generation
+    generation = cache.get(GENERATION_KEY)
+    with _lock:
+        if _tree is None or generation != _generation:
+            _tree = build()
+            _generation = generation
+        return _tree
+
+
+def mark_stale():
+    # Bumped only after the write commits: a reader rebuilding from pre-commit
+    # rows would otherwise keep that tree under the new generation.
+    transaction.on_commit(lambda: cache.set(GENERATION_KEY, time.time_ns(), None))
+
+
+def overlapping_trip_ids(start, end):
+    return get_tree().overlapping(start.timestamp(), end.timestamp())
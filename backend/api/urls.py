@@ -20,12 +20,17 @@ urlpatterns = [
     path('posts/foryou/', views.ForYouFeedView.as_view()),
     path('posts/following/', views.FollowingFeedView.as_view()),
     path('posts/<str:username>/user/', views.UserPostsView.as_view()),
+    path('posts/<str:username>/all/', views.UserAllPostsView.as_view()),
 
     path('posts/<str:model_name>/<int:pk>/like/', views.LikeToggleView.as_view()),
     path('posts/<str:model_name>/<int:pk>/save/', views.SaveToggleView.as_view()),
     path('posts/<str:model_name>/<int:pk>/comments/', views.CommentListCreateView.as_view()),
 
     path('joinable-trips/', views.JoinableTripListCreateView.as_view()),
+    path('joinable-trips/discover/', views.JoinableTripDiscoverView.as_view()),
+    path('joinable-trips/matching/', views.JoinableTripMatchingView.as_view()),
+    path('joinable-trips/recommended/', views.JoinableTripRecommendedView.as_view()),
+    path('joinable-trips/<int:pk>/similar/', views.JoinableTripSimilarView.as_view()),
     path('joinable-trips/<int:pk>/', views.JoinableTripDetailView.as_view()),
     path('joinable-trips/<int:trip_id>/join/', views.TripJoinRequestView.as_view()),
     path('joinable-trips/<int:trip_id>/interest/', views.JoinableTripInterestView.as_view()),
@@ -35,6 +40,8 @@ urlpatterns = [
     path('joinable-trips/requests/<int:request_id>/accept/', views.JoinableTripAcceptView.as_view()),
     path('joinable-trips/requests/<int:request_id>/reject/', views.JoinableTripRejectView.as_view()),
     path('search/', views.SearchView.as_view()),
+    path('nearby/', views.NearbyPostsView.as_view()),
+    path('map/clusters/', views.MapClustersView.as_view()),
     path('saved/', views.SavedPostsListView.as_view()),
     path('general-posts/', views.GeneralPostListCreateView.as_view()),
     path('general-posts/<int:pk>/', views.GeneralPostDetailView.as_view()),
@@ -0,0 +1,43 @@
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import Q
+from .models import Like, SavedPost
+
+
+class ViewerState:
+    """Liked/saved flags for a page of posts, loaded in two queries."""
+
+    def __init__(self, user, posts):
+        posts = list(posts)
+        content_types = ContentType.objects.get_for_models(*{type(post) for post in posts})
+        self.content_type_ids = {model: ct.id for model, ct in content_types.items()}
+        self.keys = {self.key(post) for post in posts}
+        self.liked = set()
+        self.saved = set()
+        if not self.keys or user is None or not user.is_authenticated:
+            return
+
+        ids_by_type = {}
+        for ct_id, object_id in self.keys:
+            ids_by_type.setdefault(ct_id, []).append(object_id)
+        targets = Q()
+        for ct_id, object_ids in ids_by_type.items():
+            targets |= Q(content_type_id=ct_id, object_id__in=object_ids)
+
+        self.liked = set(Like.objects.filter(targets, user=user).values_list('content_type_id', 'object_id'))
+        self.saved = set(SavedPost.objects.filter(targets, user=user).values_list('content_type_id', 'object_id'))
+
+    def key(self, obj):
+        return self.content_type_ids[type(obj)], obj.id
+
+    def covers(self, obj):
+        return type(obj) in self.content_type_ids and self.key(obj) in self.keys
+
+    def is_liked(self, obj):
+        return self.key(obj) in self.liked
+
+    def is_saved(self, obj):
+        return self.key(obj) in self.saved
+
+
+def viewer_context(request, posts):
+    return {'request': request, 'viewer_state': ViewerState(request.user, posts)}
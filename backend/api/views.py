@@ -5,14 +5,23 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 from django.contrib.auth import get_user_model
 from django.contrib.contenttypes.models import ContentType
-from django.db.models import Q
+from django.db import transaction
 from .models import (
     JoinableTripPost, JoinableTripImage, TripJoinRequest,
     TripGroup, TripGroupMember, ExperiencePost, ExperienceDay,
     ExperienceDayImage, GeneralPost, GeneralPostImage,
-    Like, Comment, SavedPost, Message, Notification, Follow,Story, StoryView
-
+    Like, Comment, SavedPost, Notification, Follow,Story, StoryView,
+    PostIndex
 )
+from . import autocomplete, chat, conversations, feed_cache, notifications, outbox, recommendations, search, trip_filters, trip_intervals
+from .clusters import clusters as map_clusters
+from .feeds import author_id_of, content_type_post_types, hydrate_posts, post_queryset, serialize_posts
+from .geo import nearby
+from .notification_targets import NotificationTargets
+from .pagination import decode_cursor, keyset_page, page_limit
+from .ranking import ranked_page
+from .timeline import read_timeline
+from .viewer_state import viewer_context
 from .serializers import (
     UserSerializer, RegisterSerializer, JoinableTripPostSerializer,
     TripJoinRequestSerializer, TripGroupSerializer, ExperiencePostSerializer,
@@ -73,18 +82,15 @@ class FollowToggleView(APIView):
         if target == request.user:
             return Response({'error': 'You cannot follow yourself'}, status=status.HTTP_400_BAD_REQUEST)
 
-        follow, created = Follow.objects.get_or_create(follower=request.user, following=target)
+        with transaction.atomic():
+            follow, created = Follow.objects.get_or_create(follower=request.user, following=target)
+            if not created:
+                follow.delete()
+            else:
+                notifications.notify(request.user, target, 'follow')
 
         if not created:
-            follow.delete()
             return Response({'status': 'unfollowed'})
-
-        Notification.objects.create(
-            sender=request.user,
-            receiver=target,
-            notification_type='follow',
-            text=f"{request.user.username} started following you"
-        )
         return Response({'status': 'followed'})
     
 class IsFollowingView(APIView):
@@ -133,7 +139,14 @@ class TripGroupChatView(APIView):
                 return Response({'error': 'Not a member'}, status=status.HTTP_403_FORBIDDEN)
         except TripGroup.DoesNotExist:
             return Response({'error': 'Group not found'}, status=status.HTTP_404_NOT_FOUND)
-        messages = Message.objects.filter(group=group).order_by('created_at')
+        try:
+            before, after = chat.history_bounds(request.query_params)
+        except ValueError:
+            return Response({'error': 'Invalid message id'}, status=status.HTTP_400_BAD_REQUEST)
+        limit = page_limit(request.query_params.get('limit'), chat.HISTORY_PAGE_SIZE, chat.MAX_HISTORY_PAGE_SIZE)
+        messages = chat.group_history(group, before, after, limit)
+        if before is None and messages:
+            chat.mark_group_read(group, request.user, messages[-1].id)
         serializer = MessageSerializer(messages, many=True, context={'request': request})
         return Response(serializer.data)
 
@@ -144,11 +157,7 @@ class TripGroupChatView(APIView):
                 return Response({'error': 'Not a member'}, status=status.HTTP_403_FORBIDDEN)
         except TripGroup.DoesNotExist:
             return Response({'error': 'Group not found'}, status=status.HTTP_404_NOT_FOUND)
-        message = Message.objects.create(
-            sender=request.user,
-            group=group,
-            content=request.data.get('content', '')
-        )
+        message = chat.send_group_message(request.user, group, request.data.get('content', ''))
         return Response(MessageSerializer(message, context={'request': request}).data, status=status.HTTP_201_CREATED)
 
 
@@ -178,8 +187,8 @@ class ExperiencePostListCreateView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        posts = ExperiencePost.objects.all().order_by('-created_at')
-        serializer = ExperiencePostSerializer(posts, many=True, context={'request': request})
+        posts = list(post_queryset('experience').order_by('-created_at'))
+        serializer = ExperiencePostSerializer(posts, many=True, context=viewer_context(request, posts))
         return Response(serializer.data)
 
     def post(self, request):
@@ -233,41 +242,99 @@ class ExperienceDayImageUploadView(APIView):
             return Response({'error': 'Day not found'}, status=status.HTTP_404_NOT_FOUND)
 
         images = request.FILES.getlist('images')
-        created = []
-        for image in images:
-            obj = ExperienceDayImage.objects.create(day=day, image=image)
-            created.append(ExperienceDayImageSerializer(obj).data)
-        return Response(created, status=status.HTTP_201_CREATED)
+        with transaction.atomic():
+            for image in images:
+                outbox.enqueue_image(ExperienceDayImage, 'day', day, image)
+        return Response({'queued': len(images)}, status=status.HTTP_202_ACCEPTED)
 
 
 class JoinableTripListCreateView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        trips = JoinableTripPost.objects.all().order_by('-created_at')
-        serializer = JoinableTripPostSerializer(trips, many=True, context={'request': request})
+        trips = list(post_queryset('joinable').order_by('-created_at'))
+        serializer = JoinableTripPostSerializer(trips, many=True, context=viewer_context(request, trips))
         return Response(serializer.data)
 
     def post(self, request):
         data = request.data.dict() if hasattr(request.data, 'dict') else request.data.copy()
         serializer = JoinableTripPostSerializer(data=data, context={'request': request})
         if serializer.is_valid():
-            trip = serializer.save(creator=request.user)
-            images = request.FILES.getlist('images')
-            for image in images:
-                JoinableTripImage.objects.create(trip=trip, image=image)
-            group, _ = TripGroup.objects.get_or_create(
-                trip=trip,
-                defaults={'name': f"{trip.title} Group"}
-            )
-            TripGroupMember.objects.get_or_create(
-                group=group,
-                user=request.user,
-                defaults={'role': 'admin'}
-            )
+            with transaction.atomic():
+                trip = serializer.save(creator=request.user)
+                for image in request.FILES.getlist('images'):
+                    outbox.enqueue_image(JoinableTripImage, 'trip', trip, image)
+                group, _ = TripGroup.objects.get_or_create(
+                    trip=trip,
+                    defaults={'name': f"{trip.title} Group"}
+                )
+                TripGroupMember.objects.get_or_create(
+                    group=group,
+                    user=request.user,
+                    defaults={'role': 'admin'}
+                )
             return Response(JoinableTripPostSerializer(trip, context={'request': request}).data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+class JoinableTripDiscoverView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        try:
+            filters = trip_filters.parse_filters(request.query_params)
+            cursor = decode_cursor(request.query_params.get('cursor'))
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        limit = page_limit(request.query_params.get('limit'))
+
+        trips, next_cursor = keyset_page(trip_filters.apply_filters(post_queryset('joinable'), filters), cursor, limit)
+        serializer = JoinableTripPostSerializer(trips, many=True, context=viewer_context(request, trips))
+        return Response({
+            'results': serializer.data,
+            'next_cursor': next_cursor,
+            'facets': trip_filters.facet_counts(filters),
+        })
+
+class JoinableTripMatchingView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        try:
+            start = trip_filters.parse_moment(request.query_params['start'])
+            end = trip_filters.parse_moment(request.query_params['end'], end_of_day=True)
+        except (KeyError, ValueError):
+            return Response({'error': 'start and end dates are required'}, status=status.HTTP_400_BAD_REQUEST)
+        limit = page_limit(request.query_params.get('limit'))
+
+        trip_ids = trip_intervals.overlapping_trip_ids(start, end)
+        trips = list(post_queryset('joinable').filter(id__in=trip_ids).order_by('start_date', 'id')[:limit])
+        serializer = JoinableTripPostSerializer(trips, many=True, context=viewer_context(request, trips))
+        return Response({'results': serializer.data, 'count': len(trip_ids)})
+
+class JoinableTripSimilarView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, pk):
+        limit = page_limit(request.query_params.get('limit'), default=10)
+        trip_ids = recommendations.similar_trip_ids(pk, limit * 2)
+        return Response(recommended_trips_response(request, trip_ids, limit))
+
+
+class JoinableTripRecommendedView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        limit = page_limit(request.query_params.get('limit'), default=10)
+        trip_ids = recommendations.recommended_trip_ids(request.user, limit * 2)
+        return Response(recommended_trips_response(request, trip_ids, limit))
+
+
+def recommended_trips_response(request, trip_ids, limit):
+    # Over-fetched ids are narrowed to trips that are still open, keeping similarity order.
+    trips = post_queryset('joinable').filter(id__in=trip_ids, status__in=recommendations.RECOMMENDABLE_STATUSES).in_bulk()
+    trips = [trips[trip_id] for trip_id in trip_ids if trip_id in trips][:limit]
+    return {'results': JoinableTripPostSerializer(trips, many=True, context=viewer_context(request, trips)).data}
+
 class JoinableTripDetailView(APIView):
     permission_classes = [IsAuthenticated]
 
@@ -338,27 +405,17 @@ class LikeToggleView(APIView):
             return Response({'error': 'Post not found'}, status=status.HTTP_404_NOT_FOUND)
 
         ct = ContentType.objects.get_for_model(obj)
-        like, created = Like.objects.get_or_create(user=request.user, content_type=ct, object_id=obj.id)
-
-        if not created:
-            like.delete()
-            liked = False
-        else:
-            liked = True
-            author = getattr(obj, 'author', None) or getattr(obj, 'creator', None)
-            if author and author != request.user:
-                Notification.objects.create(
-        sender=request.user,
-        receiver=author,
-        notification_type='like',
-        text=f"{request.user.username} liked your post",
-        content_type=ct,
-        object_id=obj.id
-    
-)
+        author = getattr(obj, 'author', None) or getattr(obj, 'creator', None)
+        with transaction.atomic():
+            like, created = Like.objects.get_or_create(user=request.user, content_type=ct, object_id=obj.id)
+            if not created:
+                like.delete()
+            elif author and author != request.user:
+                notifications.notify(request.user, author, 'like', target=obj)
+        liked = created
 
-        total_likes = Like.objects.filter(content_type=ct, object_id=obj.id).count()
-        return Response({'liked': liked, 'total_likes': total_likes})
+        obj.refresh_from_db(fields=['like_count'])
+        return Response({'liked': liked, 'total_likes': obj.like_count})
 
 class SaveToggleView(APIView):
     permission_classes = [IsAuthenticated]
@@ -379,10 +436,12 @@ class SaveToggleView(APIView):
             return Response({'error': 'Post not found'}, status=status.HTTP_404_NOT_FOUND)
 
         ct = ContentType.objects.get_for_model(obj)
-        saved_post, created = SavedPost.objects.get_or_create(user=request.user, content_type=ct, object_id=obj.id)
+        with transaction.atomic():
+            saved_post, created = SavedPost.objects.get_or_create(user=request.user, content_type=ct, object_id=obj.id)
+            if not created:
+                saved_post.delete()
 
         if not created:
-            saved_post.delete()
             return Response({'saved': False})
         return Response({'saved': True})
 
@@ -426,22 +485,16 @@ class CommentListCreateView(APIView):
             return Response({'error': 'Post not found'}, status=status.HTTP_404_NOT_FOUND)
 
         ct = ContentType.objects.get_for_model(obj)
-        comment = Comment.objects.create(
-            user=request.user,
-            content_type=ct,
-            object_id=obj.id,
-            text=request.data.get('text', '')
-        )
         author = getattr(obj, 'author', None) or getattr(obj, 'creator', None)
-        if author and author != request.user:
-           Notification.objects.create(
-        sender=request.user,
-        receiver=author,
-        notification_type='comment',
-        text=f"{request.user.username} commented on your post",
-        content_type=ct,
-        object_id=obj.id
-)
+        with transaction.atomic():
+            comment = Comment.objects.create(
+                user=request.user,
+                content_type=ct,
+                object_id=obj.id,
+                text=request.data.get('text', '')
+            )
+            if author and author != request.user:
+                notifications.notify(request.user, author, 'comment', target=obj)
         return Response(CommentSerializer(comment).data, status=status.HTTP_201_CREATED)
 
 
@@ -449,81 +502,121 @@ class ForYouFeedView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        feed = []
+        cached, started = feed_cache.get_response(request.user.id, 'foryou', request.query_params)
+        if cached is not None:
+            return Response(cached)
 
-        experience_posts = ExperiencePost.objects.all().order_by('-created_at')[:20]
-        for post in experience_posts:
-            data = ExperiencePostSerializer(post, context={'request': request}).data
-            data['post_type'] = 'experience'
-            feed.append(data)
+        try:
+            cursor = decode_cursor(request.query_params.get('cursor'))
+        except ValueError:
+            return Response({'error': 'Invalid cursor'}, status=status.HTTP_400_BAD_REQUEST)
+        limit = page_limit(request.query_params.get('limit'))
+
+        if request.query_params.get('order') == 'recent':
+            page, next_cursor = keyset_page(PostIndex.objects.all(), cursor, limit)
+            refs = [(entry.post_type, entry.post_id) for entry in page]
+        else:
+            try:
+                refs, next_cursor = ranked_page(request.user, cursor, limit)
+            except ValueError as e:
+                return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        items = hydrate_posts(refs)
+        data = {
+            'results': serialize_posts(items, request),
+            'next_cursor': next_cursor,
+        }
+        feed_cache.set_response(request.user.id, 'foryou', request.query_params, data, [author_id_of(obj) for _, obj in items], started)
+        return Response(data)
 
-        general_posts = GeneralPost.objects.all().order_by('-created_at')[:20]
-        for post in general_posts:
-            data = GeneralPostSerializer(post, context={'request': request}).data
-            data['post_type'] = 'general'
-            feed.append(data)
 
-        joinable_trips = JoinableTripPost.objects.all().order_by('-created_at')[:20]
-        for post in joinable_trips:
-            data = JoinableTripPostSerializer(post, context={'request': request}).data
-            data['post_type'] = 'joinable'
-            feed.append(data)
+class FollowingFeedView(APIView):
+    permission_classes = [IsAuthenticated]
+    feed_size = 60
 
-        feed.sort(key=lambda x: x['created_at'], reverse=True)
-        return Response(feed)
+    def get(self, request):
+        cached, started = feed_cache.get_response(request.user.id, 'following', request.query_params)
+        if cached is not None:
+            return Response(cached)
 
+        refs = read_timeline(request.user, self.feed_size)
+        data = serialize_posts(hydrate_posts(refs), request)
+        following_ids = Follow.objects.filter(follower=request.user).values_list('following_id', flat=True)
+        feed_cache.set_response(request.user.id, 'following', request.query_params, data, following_ids, started)
+        return Response(data)
 
-class FollowingFeedView(APIView):
+
+class NearbyPostsView(APIView):
     permission_classes = [IsAuthenticated]
+    max_radius_km = 500
 
     def get(self, request):
-        following_ids = Follow.objects.filter(follower=request.user).values_list('following_id', flat=True)
-        feed = []
-        for post in ExperiencePost.objects.filter(author_id__in=following_ids).order_by('-created_at')[:20]:
-            data = ExperiencePostSerializer(post, context={'request': request}).data
-            data['post_type'] = 'experience'
-            feed.append(data)
-        for post in GeneralPost.objects.filter(author_id__in=following_ids).order_by('-created_at')[:20]:
-            data = GeneralPostSerializer(post, context={'request': request}).data
-            data['post_type'] = 'general'
-            feed.append(data)
-        for post in JoinableTripPost.objects.filter(creator_id__in=following_ids).order_by('-created_at')[:20]:
-            data = JoinableTripPostSerializer(post, context={'request': request}).data
-            data['post_type'] = 'joinable'
-            feed.append(data)
-        feed.sort(key=lambda x: x['created_at'], reverse=True)
-        return Response(feed)
+        try:
+            latitude = float(request.query_params['lat'])
+            longitude = float(request.query_params['lng'])
+            radius = float(request.query_params.get('radius', 10))
+        except (KeyError, ValueError):
+            return Response({'error': 'lat and lng are required numbers'}, status=status.HTTP_400_BAD_REQUEST)
+        if not (-90 <= latitude <= 90 and -180 <= longitude <= 180) or not 0 < radius <= self.max_radius_km:
+            return Response({'error': 'Coordinates or radius out of range'}, status=status.HTTP_400_BAD_REQUEST)
+        limit = page_limit(request.query_params.get('limit'))
+
+        hits = nearby(latitude, longitude, radius, limit)
+        distances = {(post_type, post_id): distance for post_type, post_id, distance in hits}
+        items = hydrate_posts([(post_type, post_id) for post_type, post_id, _ in hits])
+        results = serialize_posts(items, request)
+        for data, (post_type, obj) in zip(results, items):
+            data['distance_km'] = round(distances[(post_type, obj.id)], 3)
+        return Response({'results': results})
+
+
+class MapClustersView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        try:
+            west, south, east, north = [float(value) for value in request.query_params['bbox'].split(',')]
+            zoom = int(request.query_params.get('zoom', 0))
+        except (KeyError, ValueError):
+            return Response({'error': 'bbox=west,south,east,north and an integer zoom are required'}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({'clusters': map_clusters(west, south, east, north, zoom)})
 
 
 class SearchView(APIView):
     permission_classes = [IsAuthenticated]
+    groups = {
+        'posts': 'experience',
+        'general_posts': 'general',
+        'trips': 'joinable',
+    }
 
     def get(self, request):
         query = request.query_params.get('q', '')
-        if not query:
-            return Response({'users': [], 'posts': [], 'general_posts': [], 'trips': []})
-
-        users = User.objects.filter(
-            Q(username__icontains=query) | Q(full_name__icontains=query)
-        ).exclude(id=request.user.id)[:10]
-
-        posts = ExperiencePost.objects.filter(
-            Q(title__icontains=query)
-        ).order_by('-created_at')[:10]
+        limit = page_limit(request.query_params.get('limit'), default=10)
+        try:
+            offset = max(0, int(request.query_params.get('offset', 0)))
+        except ValueError:
+            offset = 0
 
-        general_posts = GeneralPost.objects.filter(
-            Q(description__icontains=query)
-        ).order_by('-created_at')[:10]
+        ranked = {group: search.search(doc_type, query) for group, doc_type in self.groups.items()}
+        pages = {group: [doc_id for doc_id, _ in hits[offset:offset + limit]] for group, hits in ranked.items()}
 
-        trips = JoinableTripPost.objects.filter(
-            Q(title__icontains=query) | Q(destination__icontains=query)
-        ).order_by('-created_at')[:10]
+        users = autocomplete.search_users(query, limit=offset + limit, exclude=request.user.id)[offset:]
+        posts = {
+            group: [obj for _, obj in hydrate_posts([(doc_type, doc_id) for doc_id in pages[group]])]
+            for group, doc_type in self.groups.items()
+        }
 
+        context = viewer_context(request, posts['posts'] + posts['general_posts'] + posts['trips'])
         return Response({
             'users': UserSerializer(users, many=True).data,
-            'posts': ExperiencePostSerializer(posts, many=True, context={'request': request}).data,
-            'general_posts': GeneralPostSerializer(general_posts, many=True, context={'request': request}).data,
-            'trips': JoinableTripPostSerializer(trips, many=True, context={'request': request}).data,
+            'posts': ExperiencePostSerializer(posts['posts'], many=True, context=context).data,
+            'general_posts': GeneralPostSerializer(posts['general_posts'], many=True, context=context).data,
+            'trips': JoinableTripPostSerializer(posts['trips'], many=True, context=context).data,
+            'counts': {
+                'users': autocomplete.count_users(query, exclude=request.user.id),
+                **{group: len(hits) for group, hits in ranked.items()},
+            },
         })
 
 
@@ -531,44 +624,35 @@ class ConversationListView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        messages = Message.objects.filter(
-            Q(sender=request.user, receiver__isnull=False) |
-            Q(receiver=request.user)
-        ).order_by('-created_at')
-
-        seen = set()
-        conversations = []
-        for msg in messages:
-            other = msg.receiver if msg.sender == request.user else msg.sender
-            if other and other.id not in seen:
-                seen.add(other.id)
-                unread_count = Message.objects.filter(
-                    sender=other,
-                    receiver=request.user,
-                    is_read=False
-                ).count()
-                conversations.append({
-                    'id': other.id,
-                    'user': UserSerializer(other).data,
-                    'last_message': msg.content,
-                    'unread_count': unread_count,
-                })
-        return Response(conversations)
+        data = []
+        for conversation in conversations.for_user(request.user):
+            if conversation.first_user_id == request.user.id:
+                other, unread_count = conversation.second_user, conversation.first_unread
+            else:
+                other, unread_count = conversation.first_user, conversation.second_unread
+            data.append({
+                'id': other.id,
+                'user': UserSerializer(other).data,
+                'last_message': conversation.last_message_preview,
+                'last_activity_at': conversation.last_activity_at,
+                'unread_count': unread_count,
+            })
+        return Response(data)
 
 class ChatView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request, user_id):
-        Message.objects.filter(
-            sender_id=user_id,
-            receiver=request.user,
-            is_read=False
-        ).update(is_read=True)
-        messages = Message.objects.filter(
-            Q(sender=request.user, receiver_id=user_id) |
-            Q(sender_id=user_id, receiver=request.user)
-        ).order_by('created_at')
-        serializer = MessageSerializer(messages, many=True, context={'request': request})
+        try:
+            before, after = chat.history_bounds(request.query_params)
+        except ValueError:
+            return Response({'error': 'Invalid message id'}, status=status.HTTP_400_BAD_REQUEST)
+        if before is None:
+            conversations.mark_read(request.user, user_id)
+        limit = page_limit(request.query_params.get('limit'), chat.HISTORY_PAGE_SIZE, chat.MAX_HISTORY_PAGE_SIZE)
+        messages = chat.direct_history(request.user, user_id, before, after, limit)
+        context = {'request': request, 'read_cursors': conversations.read_cursors(request.user, user_id)}
+        serializer = MessageSerializer(messages, many=True, context=context)
         return Response(serializer.data)
 
     def post(self, request, user_id):
@@ -577,11 +661,7 @@ class ChatView(APIView):
         except User.DoesNotExist:
             return Response({'error': 'User not found'}, status=status.HTTP_404_NOT_FOUND)
 
-        message = Message.objects.create(
-            sender=request.user,
-            receiver=receiver,
-            content=request.data.get('content', '')
-        )
+        message = chat.send_direct_message(request.user, receiver, request.data.get('content', ''))
         return Response(MessageSerializer(message, context={'request': request}).data, status=status.HTTP_201_CREATED)
 
 
@@ -589,14 +669,19 @@ class NotificationListView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        notifications = Notification.objects.filter(
-            receiver=request.user
-        ).order_by('-created_at')
-        serializer = NotificationSerializer(notifications, many=True, context={'request': request})
-        unread_count = notifications.filter(is_read=False).count()
+        try:
+            cursor = decode_cursor(request.query_params.get('cursor'))
+        except ValueError:
+            return Response({'error': 'Invalid cursor'}, status=status.HTTP_400_BAD_REQUEST)
+        limit = page_limit(request.query_params.get('limit'))
+
+        received = Notification.objects.filter(receiver=request.user).select_related('sender')
+        page, next_cursor = keyset_page(received, cursor, limit, field='updated_at')
+        context = {'request': request, 'targets': NotificationTargets(page)}
         return Response({
-            'notifications': serializer.data,
-            'unread_count': unread_count
+            'notifications': NotificationSerializer(page, many=True, context=context).data,
+            'unread_count': notifications.unread_count(request.user.id),
+            'next_cursor': next_cursor,
         })
 
 class MarkAllNotificationsReadView(APIView):
@@ -604,6 +689,7 @@ class MarkAllNotificationsReadView(APIView):
 
     def post(self, request):
         Notification.objects.filter(receiver=request.user, is_read=False).update(is_read=True)
+        transaction.on_commit(lambda: notifications.push_unread_count(request.user.id))
         return Response({'message': 'All notifications marked as read'})
 
 
@@ -611,25 +697,10 @@ class SavedPostsListView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        saved = SavedPost.objects.filter(user=request.user).order_by('-saved_at')
-        posts = []
-        for item in saved:
-            obj = item.content_object
-            if obj is None:
-                continue
-            if isinstance(obj, ExperiencePost):
-                data = ExperiencePostSerializer(obj, context={'request': request}).data
-                data['post_type'] = 'experience'
-                posts.append(data)
-            elif isinstance(obj, GeneralPost):
-                data = GeneralPostSerializer(obj, context={'request': request}).data
-                data['post_type'] = 'general'
-                posts.append(data)
-            elif isinstance(obj, JoinableTripPost):
-                data = JoinableTripPostSerializer(obj, context={'request': request}).data
-                data['post_type'] = 'joinable'
-                posts.append(data)
-        return Response(posts)
+        post_types = content_type_post_types()
+        saved = SavedPost.objects.filter(user=request.user).order_by('-saved_at').values_list('content_type_id', 'object_id')
+        refs = [(post_types[ct_id], object_id) for ct_id, object_id in saved if ct_id in post_types]
+        return Response(serialize_posts(hydrate_posts(refs), request))
 
 class UserPostsView(APIView):
     permission_classes = [IsAuthenticated]
@@ -640,31 +711,53 @@ class UserPostsView(APIView):
         except User.DoesNotExist:
             return Response({'error': 'User not found'}, status=status.HTTP_404_NOT_FOUND)
 
-        posts = ExperiencePost.objects.filter(author=user).order_by('-created_at')
-        serializer = ExperiencePostSerializer(posts, many=True, context={'request': request})
+        posts = list(post_queryset('experience').filter(author=user).order_by('-created_at'))
+        serializer = ExperiencePostSerializer(posts, many=True, context=viewer_context(request, posts))
         return Response(serializer.data)
+
+
+class UserAllPostsView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, username):
+        try:
+            user = User.objects.get(username=username)
+        except User.DoesNotExist:
+            return Response({'error': 'User not found'}, status=status.HTTP_404_NOT_FOUND)
+        try:
+            cursor = decode_cursor(request.query_params.get('cursor'))
+        except ValueError:
+            return Response({'error': 'Invalid cursor'}, status=status.HTTP_400_BAD_REQUEST)
+        limit = page_limit(request.query_params.get('limit'))
+
+        page, next_cursor = keyset_page(PostIndex.objects.filter(author=user), cursor, limit)
+        refs = [(entry.post_type, entry.post_id) for entry in page]
+        return Response({
+            'results': serialize_posts(hydrate_posts(refs), request),
+            'next_cursor': next_cursor,
+        })
     
 class GeneralPostListCreateView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        posts = GeneralPost.objects.all().order_by('-created_at')
-        serializer = GeneralPostSerializer(posts, many=True, context={'request': request})
+        posts = list(post_queryset('general').order_by('-created_at'))
+        serializer = GeneralPostSerializer(posts, many=True, context=viewer_context(request, posts))
         return Response(serializer.data)
 
     def post(self, request):
         description = request.data.get('description', '')
         latitude = request.data.get('latitude', None)
         longitude = request.data.get('longitude', None)
-        post = GeneralPost.objects.create(
-            author=request.user,
-            description=description,
-            latitude=latitude,
-            longitude=longitude
-        )
-        images = request.FILES.getlist('images')
-        for image in images:
-            GeneralPostImage.objects.create(post=post, image=image)
+        with transaction.atomic():
+            post = GeneralPost.objects.create(
+                author=request.user,
+                description=description,
+                latitude=latitude,
+                longitude=longitude
+            )
+            for image in request.FILES.getlist('images'):
+                outbox.enqueue_image(GeneralPostImage, 'post', post, image)
         serializer = GeneralPostSerializer(post, context={'request': request})
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
@@ -681,6 +774,7 @@ class JoinableTripInterestView(APIView):
         if trip.creator == request.user:
             return Response({'error': 'You cannot join your own trip'}, status=status.HTTP_400_BAD_REQUEST)
 
+        # The owner's notification is queued by the TripJoinRequest post_save signal.
         join_request, created = TripJoinRequest.objects.get_or_create(
             user=request.user,
             trip=trip
@@ -689,16 +783,6 @@ class JoinableTripInterestView(APIView):
         if not created:
             return Response({'message': 'Already requested', 'status': join_request.status})
 
-        Notification.objects.get_or_create(
-    sender=request.user,
-    receiver=trip.creator,
-    notification_type='join_request',
-    object_id=join_request.id,
-    defaults={
-        'text': f"{request.user.username} is interested in joining your trip '{trip.title}'",
-        'content_type': ContentType.objects.get_for_model(join_request),
-    }
-)
         return Response(TripJoinRequestSerializer(join_request).data, status=status.HTTP_201_CREATED)
     
 class JoinableTripRequestsView(APIView):
@@ -724,34 +808,28 @@ class JoinableTripAcceptView(APIView):
         except TripJoinRequest.DoesNotExist:
             return Response({'error': 'Request not found'}, status=status.HTTP_404_NOT_FOUND)
 
-        join_request.status = 'accepted'
-        join_request.save()
-
-        group, _ = TripGroup.objects.get_or_create(
-            trip=join_request.trip,
-            defaults={'name': f"{join_request.trip.title} Group"}
-        )
+        with transaction.atomic():
+            # The acceptance signal already joined the requester to the group;
+            # it is fetched here for the response and the creator made admin.
+            join_request.status = 'accepted'
+            join_request.save()
 
-        TripGroupMember.objects.get_or_create(
-            group=group,
-            user=join_request.user,
-            defaults={'role': 'member'}
-        )
+            group, _ = TripGroup.objects.get_or_create(
+                trip=join_request.trip,
+                defaults={'name': f"{join_request.trip.title} Group"}
+            )
 
-        TripGroupMember.objects.get_or_create(
-            group=group,
-            user=request.user,
-            defaults={'role': 'admin'}
-        )
+            TripGroupMember.objects.get_or_create(
+                group=group,
+                user=join_request.user,
+                defaults={'role': 'member'}
+            )
 
-        Notification.objects.create(
-            sender=request.user,
-            receiver=join_request.user,
-            notification_type='request_accepted',
-            text=f"{request.user.username} accepted your request to join the trip '{join_request.trip.title}'",
-            content_type=ContentType.objects.get_for_model(join_request),
-            object_id=join_request.id
-        )
+            TripGroupMember.objects.get_or_create(
+                group=group,
+                user=request.user,
+                defaults={'role': 'admin'}
+            )
 
         return Response({
             'message': 'Request accepted',
@@ -778,9 +856,7 @@ class UserSearchForMessageView(APIView):
         query = request.query_params.get('q', '')
         if not query:
             return Response([])
-        users = User.objects.filter(
-            Q(username__icontains=query)
-        ).exclude(id=request.user.id)[:10]
+        users = autocomplete.search_users(query, limit=10, exclude=request.user.id)
         serializer = UserSerializer(users, many=True)
         return Response(serializer.data)
 
@@ -791,15 +867,8 @@ class UnreadCountsView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        unread_messages = Message.objects.filter(
-            receiver=request.user,
-            is_read=False,
-            group__isnull=True
-        ).count()
-        unread_notifications = Notification.objects.filter(
-            receiver=request.user,
-            is_read=False
-        ).count()
+        unread_messages = conversations.unread_total(request.user) + chat.group_unread_total(request.user)
+        unread_notifications = notifications.unread_count(request.user.id)
         return Response({
             'messages': unread_messages,
             'notifications': unread_notifications
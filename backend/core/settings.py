@@ -85,6 +85,34 @@ CHANNEL_LAYERS = {
     }
 }
 
+# ================= CACHE ================= #
+
+# Feed cache versions and the generations of the per-process indexes
+# (autocomplete, trip intervals, map clusters) live here. They only reach other
+# processes, including management commands, through a shared backend (file,
+# redis); the local-memory default suits a single process.
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('CACHE_LOCATION', 'travelmates'),
+    }
+}
+
+FEED_CACHE_TTL = int(os.environ.get('FEED_CACHE_TTL', 60))
+
+# Written by `manage.py build_trip_vectors`, memory-mapped by the API
+RECOMMENDATIONS_DIR = os.environ.get('RECOMMENDATIONS_DIR', os.path.join(BASE_DIR, 'recommendations'))
+
+# Messages older than this are moved to gzipped NDJSON segments by `manage.py archive_messages`
+MESSAGE_ARCHIVE_DIR = os.environ.get('MESSAGE_ARCHIVE_DIR', os.path.join(BASE_DIR, 'message_archive'))
+MESSAGE_ARCHIVE_AFTER_DAYS = int(os.environ.get('MESSAGE_ARCHIVE_AFTER_DAYS', 180))
+
+# Likes, comments and follows on the same target within this window share one notification
+NOTIFICATION_AGGREGATION_HOURS = int(os.environ.get('NOTIFICATION_AGGREGATION_HOURS', 24))
+
+# Finished outbox jobs and orphaned staged uploads are pruned after this many hours
+OUTBOX_RETENTION_HOURS = int(os.environ.get('OUTBOX_RETENTION_HOURS', 72))
+
 # ================= DATABASE ================= #
 
 DATABASE_URL = os.environ.get('DATABASE_URL', None)
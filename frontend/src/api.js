@@ -69,4 +69,8 @@ export const registerUser = async (data) => {
   }
 };
 
+// ✅ FOR YOU FEED (keyset-paginated: { results, next_cursor })
+export const getForYouFeed = (cursor = null) =>
+  api.get("/posts/foryou/", { params: cursor ? { cursor } : {} });
+
 export default api;
\ No newline at end of file
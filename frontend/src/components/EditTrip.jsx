@@ -1,4 +1,4 @@
-import React, { useState, useEffect, useCallback } from 'react';
+import React, { useState, useEffect, useCallback, useRef } from 'react';
 import { useParams, Link } from 'react-router-dom';
 import api from '../api';
 import { getMediaUrl } from '../utils';
@@ -13,6 +13,9 @@ const EditTrip = () => {
     const [photos, setPhotos] = useState([]);
     const [uploadingPhotos, setUploadingPhotos] = useState(false);
     const [currentDayId, setCurrentDayId] = useState(null);
+    // Day photos are uploaded by a background worker; { dayId: photos expected } until they show up.
+    const [pendingPhotos, setPendingPhotos] = useState({});
+    const photoPolls = useRef(0);
 
     const fetchTripDetails = useCallback(async () => {
         try {
@@ -28,6 +31,34 @@ const EditTrip = () => {
 
     useEffect(() => { fetchTripDetails(); }, [fetchTripDetails]);
 
+    useEffect(() => {
+        if (!trip) return;
+        const stillPending = Object.fromEntries(
+            Object.entries(pendingPhotos).filter(([dayId, expected]) => {
+                const day = trip.days?.find((d) => String(d.id) === dayId);
+                return (day?.photos?.length || 0) < expected;
+            })
+        );
+        if (Object.keys(stillPending).length !== Object.keys(pendingPhotos).length) {
+            setPendingPhotos(stillPending);
+            return;
+        }
+        if (Object.keys(stillPending).length === 0) {
+            photoPolls.current = 0;
+            return;
+        }
+        if (photoPolls.current >= 40) {
+            photoPolls.current = 0;
+            setPendingPhotos({});
+            return;
+        }
+        const timer = setTimeout(() => {
+            photoPolls.current += 1;
+            fetchTripDetails();
+        }, 3000);
+        return () => clearTimeout(timer);
+    }, [trip, pendingPhotos, fetchTripDetails]);
+
     const handleAddDay = async (e) => {
         e.preventDefault();
         try {
@@ -44,9 +75,10 @@ const EditTrip = () => {
                 setUploadingPhotos(true);
                 const formData = new FormData();
                 photos.forEach((photo) => formData.append('images', photo));
-                await api.post(`/days/${res.data.id}/images/`, formData, {
+                const upload = await api.post(`/days/${res.data.id}/images/`, formData, {
                     headers: { 'Content-Type': 'multipart/form-data' },
                 });
+                setPendingPhotos((prev) => ({ ...prev, [res.data.id]: upload.data.queued }));
                 setUploadingPhotos(false);
             }
 
@@ -84,6 +116,9 @@ const EditTrip = () => {
                                     Day {day.day_number}{day.location_name ? `: ${day.location_name}` : ''}
                                 </h3>
                                 <p className="text-gray-700 mt-1">{day.description}</p>
+                                {pendingPhotos[day.id] && (
+                                    <p className="text-sm text-gray-400 mt-2">Processing photos...</p>
+                                )}
                                 {day.photos?.length > 0 && (
                                     <div className="flex gap-2 mt-3 flex-wrap">
                                         {day.photos.map((photo) => (
@@ -10,7 +10,9 @@ import useRefresh from "./useRefresh";
 export default function Home() {
     const [activeTab, setActiveTab] = useState("foryou");
     const [posts, setPosts] = useState([]);
+    const [nextCursor, setNextCursor] = useState(null);
     const [loading, setLoading] = useState(false);
+    const [loadingMore, setLoadingMore] = useState(false);
     const [refreshing, setRefreshing] = useState(false);
     const [pullDistance, setPullDistance] = useState(0);
    
@@ -24,17 +26,21 @@ export default function Home() {
         else setLoading(true);
         try {
             let data = [];
+            let cursor = null;
             if (activeTab === "foryou") {
                 const res = await getForYouFeed();
-                data = res.data || [];
+                data = res.data?.results || [];
+                cursor = res.data?.next_cursor || null;
             } else {
                 const res = await api.get("/posts/following/");
                 data = res.data || [];
             }
             setPosts(data);
+            setNextCursor(cursor);
         } catch (err) {
             console.error("Error fetching feed:", err);
             setPosts([]);
+            setNextCursor(null);
         } finally {
             setLoading(false);
             setRefreshing(false);
@@ -43,6 +49,20 @@ export default function Home() {
         }
     }, [activeTab]);
 
+    const loadMore = async () => {
+        if (!nextCursor || loadingMore) return;
+        setLoadingMore(true);
+        try {
+            const res = await getForYouFeed(nextCursor);
+            setPosts(prev => [...prev, ...(res.data?.results || [])]);
+            setNextCursor(res.data?.next_cursor || null);
+        } catch (err) {
+            console.error("Error loading more posts:", err);
+        } finally {
+            setLoadingMore(false);
+        }
+    };
+
     // Fetch on tab change or home refresh trigger
     useEffect(() => {
         fetchFeed();
@@ -159,6 +179,17 @@ export default function Home() {
                         onDelete={handleDeletePost}
                     />
                 ))}
+                {!loading && activeTab === "foryou" && nextCursor && (
+                    <div className="flex justify-center py-4">
+                        <button
+                            onClick={loadMore}
+                            disabled={loadingMore}
+                            className="text-sm text-teal-600 font-medium px-4 py-2 rounded-full border border-teal-600"
+                        >
+                            {loadingMore ? "Loading..." : "Load more"}
+                        </button>
+                    </div>
+                )}
             </div>
         </div>
     );